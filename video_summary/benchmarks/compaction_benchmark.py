@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Transcript Compaction Benchmark for Video Summary
+Measures how much transcript compaction shrinks the summarizer's input on fixture
+transcripts and, with --llm, compares summary latency, prompt size and key-term
+coverage between raw and compacted transcripts.
+
+Usage:
+    python video_summary/benchmarks/compaction_benchmark.py
+    python video_summary/benchmarks/compaction_benchmark.py --llm --runs 3
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import yaml
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.append(SRC_DIR)
+from config.settings import AppConfig
+from chat_memory import estimate_tokens
+from job_store import format_transcript
+from transcript_compaction import compact_segments, compaction_report
+
+
+def load_fixture(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    fixture["name"] = os.path.splitext(os.path.basename(path))[0]
+    fixture["segments"] = [
+        {"start": start, "end": end, "text": text, "avg_logprob": None}
+        for start, end, text in fixture["segments"]
+    ]
+    return fixture
+
+
+def summary_prompt(transcript: str, language: str) -> str:
+    """The summary task as the summarizer agent sees it, with the transcript as context"""
+    with open(os.path.join(SRC_DIR, "config", "tasks.yaml"), "r", encoding="utf-8") as f:
+        task = yaml.safe_load(f)["summary_task"]
+    description = task["description"].replace("{language}", language)
+    return f"{description}\n\nExpected output: {task['expected_output']}\n\nTRANSCRIPT:\n{transcript}"
+
+
+def key_term_coverage(summary: str, key_terms: list) -> float:
+    summary = summary.lower()
+    return sum(term.lower() in summary for term in key_terms) / len(key_terms)
+
+
+def run_llm(llm, segments: list, fixture: dict, runs: int) -> dict:
+    prompt = summary_prompt(format_transcript(segments), fixture["language"])
+    latencies, coverages = [], []
+    for _ in range(runs):
+        started = time.time()
+        summary = llm.call([{"role": "user", "content": prompt}])
+        latencies.append(time.time() - started)
+        coverages.append(key_term_coverage(summary, fixture["key_terms"]))
+    return {
+        "prompt_tokens": estimate_tokens(prompt),
+        "latency": sum(latencies) / runs,
+        "coverage": sum(coverages) / runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also summarize with the configured MODEL")
+    parser.add_argument("--runs", type=int, default=3, help="LLM calls per transcript variant")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("TRANSCRIPT COMPACTION BENCHMARK")
+    print("=" * 50)
+
+    llm = None
+    if args.llm:
+        from crewai import LLM
+        llm = LLM(model=AppConfig.LLM_MODEL)
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        fixture = load_fixture(path)
+        compacted = compact_segments(fixture["segments"], fixture["source"])
+        report = compaction_report(fixture["segments"], compacted)
+
+        print(f"\n📄 {fixture['name']} - {fixture['description']}")
+        print(f"   Segments: {report['raw_segments']} -> {report['compacted_segments']}")
+        print(f"   Tokens:   {report['raw_tokens']} -> {report['compacted_tokens']} "
+              f"({report['token_reduction']:.1%} fewer)")
+
+        if llm is None:
+            continue
+        raw = run_llm(llm, fixture["segments"], fixture, args.runs)
+        compact = run_llm(llm, compacted, fixture, args.runs)
+        for label, result in (("raw", raw), ("compacted", compact)):
+            print(f"   {label:<10} prompt ~{result['prompt_tokens']} tokens, "
+                  f"{result['latency']:.2f}s, key-term coverage {result['coverage']:.0%}")
+        if compact["coverage"] >= raw["coverage"]:
+            print("   ✅ Summary coverage held with the compacted transcript")
+        else:
+            print("   ❌ Summary coverage dropped with the compacted transcript")
+
+    if llm is None:
+        print("\nℹ️  Run with --llm to compare summary latency and quality")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+CPU Slot Benchmark for Video Summary
+Transcribes the same audio clip concurrently under several CPU slot configurations and
+reports aggregate throughput in audio-hours per hour, to tune TRANSCRIPTION_SLOTS,
+THREADS_PER_SLOT and PIN_CPU_CORES for a node.
+
+Each configuration is written SLOTSxTHREADS; "auto" tries every split of the cores into
+1, 2, 4, ... slots. Every slot loads its own model, as concurrent jobs do.
+
+Usage:
+    python video_summary/benchmarks/cpu_slots_benchmark.py audio.mp3
+    python video_summary/benchmarks/cpu_slots_benchmark.py audio.mp3 --configs 1x8,2x4,4x2 --pin --model tiny
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary"))
+import whisper
+from whisper.audio import SAMPLE_RATE
+from cpu_slots import CpuSlots, available_cores, AFFINITY_SUPPORTED
+
+
+def auto_configs(cores: int) -> list:
+    configs = []
+    slots = 1
+    while slots <= cores:
+        configs.append((slots, cores // slots))
+        slots *= 2
+    return configs
+
+
+def parse_configs(value: str, cores: int) -> list:
+    if value == "auto":
+        return auto_configs(cores)
+    return [tuple(int(n) for n in config.split("x")) for config in value.split(",")]
+
+
+def run_config(audio, model_name: str, slots: int, threads: int, pin: bool, jobs: int, language: str) -> dict:
+    cpu_slots = CpuSlots(slots=slots, threads_per_slot=threads, pin_cores=pin)
+    # Whisper installs decoding hooks on the model, so concurrent jobs cannot share one
+    models = [whisper.load_model(model_name, device="cpu") for _ in range(slots)]
+
+    def transcribe(_):
+        with cpu_slots.acquire() as slot:
+            models[slot.index].transcribe(audio, language=language, fp16=False)
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=slots) as executor:
+        list(executor.map(transcribe, range(jobs)))
+    elapsed = time.time() - started
+
+    audio_seconds = jobs * len(audio) / SAMPLE_RATE
+    return {
+        "description": cpu_slots.describe(),
+        "elapsed": elapsed,
+        "throughput": audio_seconds / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="audio file to transcribe")
+    parser.add_argument("--configs", default="auto", help="comma-separated SLOTSxTHREADS, or auto")
+    parser.add_argument("--model", default="tiny", help="Whisper model size")
+    parser.add_argument("--seconds", type=int, default=60, help="length of the clip each job transcribes")
+    parser.add_argument("--jobs", type=int, default=0, help="jobs per configuration (default: 2 per slot)")
+    parser.add_argument("--language", default="en", help="spoken language, so detection is not timed")
+    parser.add_argument("--pin", action="store_true", help="pin each slot to its own cores")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("CPU SLOT BENCHMARK")
+    print("=" * 50)
+
+    cores = len(available_cores())
+    print(f"ℹ️  {cores} cores available, model '{args.model}', {args.seconds}s clip")
+    if args.pin and not AFFINITY_SUPPORTED:
+        print("❌ Core pinning is not supported on this platform, running unpinned")
+
+    audio = whisper.load_audio(args.audio)[: args.seconds * SAMPLE_RATE]
+    results = []
+    for slots, threads in parse_configs(args.configs, cores):
+        jobs = args.jobs or 2 * slots
+        result = run_config(audio, args.model, slots, threads, args.pin, jobs, args.language)
+        results.append(result)
+        print(f"\n🧵 {result['description']}, {jobs} jobs")
+        print(f"   Wall time:  {result['elapsed']:.1f}s")
+        print(f"   Throughput: {result['throughput']:.1f} audio-hours/hour")
+
+    best = max(results, key=lambda result: result["throughput"])
+    print(f"\n✅ Best: {best['description']} at {best['throughput']:.1f} audio-hours/hour")
+
+
+if __name__ == "__main__":
+    main()
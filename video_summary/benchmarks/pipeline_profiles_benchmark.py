@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Pipeline Profile Benchmark for Video Summary
+Runs the summarization pipeline on one input with each profile from config/pipeline.yaml,
+every profile from scratch in its own jobs directory, and compares wall time, per-stage
+timings, transcript and summary size and, with --key-terms, key-term coverage.
+
+Usage:
+    python video_summary/benchmarks/pipeline_profiles_benchmark.py https://www.youtube.com/watch?v=...
+    python video_summary/benchmarks/pipeline_profiles_benchmark.py talk.mp3 --profiles fast,accurate --key-terms "whisper,crewai"
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary"))
+from config.settings import AppConfig
+from chat_memory import estimate_tokens
+from crew import VideoSummary
+from job_store import JobStore, make_job_id, format_transcript
+from pipeline import profile_names
+
+
+def run_profile(content: str, language: str, profile_name: str) -> dict:
+    # A fresh jobs directory per profile, so no profile reuses another one's checkpoints
+    AppConfig.JOBS_DIR = tempfile.mkdtemp(prefix=f"jobs_{profile_name}_")
+    job_id = make_job_id(content)
+
+    started = time.time()
+    summary_path = VideoSummary().run_summarization({"content": content, "language": language}, job_id, profile_name)
+    elapsed = time.time() - started
+
+    store = JobStore(job_id)
+    with open(summary_path, "r", encoding="utf-8") as f:
+        summary = f.read()
+    return {
+        "elapsed": elapsed,
+        "timings": store.load_json("metrics.json", {}).get("timings", {}),
+        "transcript_tokens": estimate_tokens(format_transcript(store.load_transcript() or [])),
+        "summary_tokens": estimate_tokens(summary),
+        "summary": summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("content", help="YouTube URL or audio file")
+    parser.add_argument("--profiles", default=",".join(profile_names()), help="comma-separated profile names")
+    parser.add_argument("--language", default="en", help="summary language code")
+    parser.add_argument("--key-terms", default="", help="comma-separated terms a good summary mentions")
+    args = parser.parse_args()
+    key_terms = [term.strip() for term in args.key_terms.split(",") if term.strip()]
+
+    print("=" * 50)
+    print("PIPELINE PROFILE BENCHMARK")
+    print("=" * 50)
+
+    results = {}
+    for profile_name in args.profiles.split(","):
+        print(f"\n🚀 Running profile '{profile_name}'...")
+        try:
+            result = run_profile(args.content, args.language, profile_name)
+        except Exception as e:
+            print(f"   ❌ Failed: {e}")
+            continue
+        results[profile_name] = result
+
+        print(f"   Wall time:  {result['elapsed']:.1f}s")
+        for stage, seconds in result["timings"].items():
+            print(f"   - {stage:<28} {seconds:.1f}s")
+        print(f"   Transcript: ~{result['transcript_tokens']} tokens")
+        print(f"   Summary:    ~{result['summary_tokens']} tokens")
+        if key_terms:
+            summary = result["summary"].lower()
+            coverage = sum(term.lower() in summary for term in key_terms) / len(key_terms)
+            print(f"   Key-term coverage: {coverage:.0%}")
+
+    if results:
+        fastest = min(results, key=lambda name: results[name]["elapsed"])
+        print(f"\n✅ Fastest profile: {fastest} ({results[fastest]['elapsed']:.1f}s)")
+    if not key_terms:
+        print("ℹ️  Pass --key-terms to compare summary quality")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Search Cache Benchmark for Video Summary
+Runs the info_finder search cache against a local fake Serper endpoint and reports
+hit rate, coalesced requests and latency saved.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary"))
+from config.settings import AppConfig
+from tools.search_cache_tool import SearchCache, serper_search
+
+FAKE_LATENCY_SECONDS = 0.3
+USERS = 8
+QUESTIONS_PER_USER = 10
+POPULAR_QUERIES = [
+    "who is the speaker in the video",
+    "Who is the speaker in the video?",
+    "song peak chart position germany",
+    "release date of the album",
+    "what is ffmpeg",
+    "crewai hierarchical process",
+]
+
+
+class FakeSerper:
+    """Minimal stand-in for google.serper.dev that counts the searches it serves"""
+
+    def __init__(self):
+        self.requests = 0
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["q"]
+                with fake.lock:
+                    fake.requests += 1
+                time.sleep(FAKE_LATENCY_SECONDS)
+                body = json.dumps({"organic": [
+                    {"title": f"Result for {query}", "link": "https://example.com", "snippet": "..."}
+                ]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/search"
+
+
+def run_user(cache: SearchCache, seed: int) -> float:
+    rng = random.Random(seed)
+    started = time.time()
+    for _ in range(QUESTIONS_PER_USER):
+        cache.search(rng.choice(POPULAR_QUERIES))
+    return time.time() - started
+
+
+def main():
+    print("=" * 50)
+    print("SEARCH CACHE BENCHMARK")
+    print("=" * 50)
+
+    fake = FakeSerper()
+    AppConfig.SERPER_URL = fake.url
+    os.environ.setdefault("SERPER_API_KEY", "fake-key")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SearchCache(
+            os.path.join(tmp_dir, "search_cache.db"),
+            ttl_seconds=3600,
+            quota_per_minute=100,
+            backend=serper_search,
+        )
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=USERS) as pool:
+            list(pool.map(lambda seed: run_user(cache, seed), range(USERS)))
+        elapsed = time.time() - started
+        metrics = cache.metrics()
+
+    lookups = USERS * QUESTIONS_PER_USER
+    unique_queries = len({query.lower().rstrip("?") for query in POPULAR_QUERIES})
+    print(f"Lookups:               {metrics['lookups']}")
+    print(f"Backend searches:      {fake.requests} (unique normalized queries: {unique_queries})")
+    print(f"Cache hits:            {metrics['hits']}")
+    print(f"Coalesced:             {metrics['coalesced']}")
+    print(f"Hit rate:              {metrics['hit_rate']:.1%}")
+    print(f"Latency saved:         {metrics['latency_saved_seconds']:.1f}s")
+    print(f"Wall time:             {elapsed:.2f}s (uncached: ~{lookups * FAKE_LATENCY_SECONDS / USERS:.2f}s)")
+
+    if fake.requests <= unique_queries:
+        print("\n✅ Each normalized query reached the backend at most once")
+    else:
+        print("\n❌ Duplicate backend searches detected")
+
+    fake.server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
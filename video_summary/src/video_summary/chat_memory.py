@@ -0,0 +1,104 @@
+from crewai import LLM
+from config.settings import AppConfig
+
+COMPACT_PROMPT = (
+    "You maintain the running summary of a conversation between a user and an assistant "
+    "about a video summary. Update the running summary with the new turns below. Keep every "
+    "fact, name, preference and open question the assistant may need later, drop small talk, "
+    "and stay under {max_words} words.\n\n"
+    "RUNNING SUMMARY:\n{summary}\n\nNEW TURNS:\n{turns}"
+)
+
+TRUNCATED = " [...]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Chat history for the chat crew, kept within a fixed token budget.
+
+    The most recent turns are kept verbatim. Whenever the history goes over the budget, the
+    oldest turns are folded into a rolling summary by the LLM, down to the latest turn if
+    need be, so the prompt stays bounded however long the conversation runs. Turns are
+    stored intact; only render() shortens a history that still does not fit.
+    """
+
+    def __init__(self, token_budget: int = None, llm=None):
+        self.token_budget = token_budget or AppConfig.CHAT_MEMORY_TOKENS
+        self.llm = llm
+        self.summary = ""
+        self.turns = []
+        self.turn_stats = []
+
+    def _format_turns(self, turns: list) -> str:
+        return "\n".join(f"{turn['role'].upper()}: {turn['content']}" for turn in turns)
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + estimate_tokens(self._format_turns(self.turns))
+
+    def add_turn(self, role: str, content: str) -> None:
+        self.turns.append({"role": role, "content": content})
+        self.compact()
+
+    def compact(self) -> None:
+        """Fold the oldest verbatim turns into the rolling summary until the budget is met"""
+        overflow = []
+        while self.tokens() > self.token_budget and len(self.turns) > 1:
+            overflow.append(self.turns.pop(0))
+        if not overflow:
+            return
+
+        # The summary gets at most half of the budget; the rest is for verbatim turns
+        max_words = max(50, self.token_budget // 2 * 3 // 4)
+        prompt = COMPACT_PROMPT.format(
+            max_words=max_words,
+            summary=self.summary or "(empty)",
+            turns=self._format_turns(overflow),
+        )
+        try:
+            self.llm = self.llm or LLM(model=AppConfig.LLM_MODEL)
+            self.summary = self.llm.call([{"role": "user", "content": prompt}]).strip()
+        except Exception:
+            # Keep the turns verbatim rather than lose them or the reply being recorded;
+            # the next turn retries the compaction
+            self.turns[:0] = overflow
+
+    def render(self) -> str:
+        """
+        Conversation context to put into the chat prompt. When the history is still over
+        the budget (a compaction failed, or the latest turn alone is too long), the oldest
+        turns, then the summary, are truncated in the rendered text only.
+        """
+        summary = self.summary
+        turns = [dict(turn) for turn in self.turns]
+        for turn in turns:
+            excess = estimate_tokens(summary) + estimate_tokens(self._format_turns(turns)) - self.token_budget
+            if excess <= 0:
+                break
+            keep = max(0, len(turn["content"]) - excess * 4 - len(TRUNCATED))
+            turn["content"] = turn["content"][:keep].rstrip() + TRUNCATED
+        excess = estimate_tokens(summary) + estimate_tokens(self._format_turns(turns)) - self.token_budget
+        if excess > 0:
+            summary = summary[:max(0, len(summary) - excess * 4)].rstrip()
+
+        parts = []
+        if summary:
+            parts.append(f"Earlier in the conversation (summarized): {summary}")
+        if turns:
+            parts.append(self._format_turns(turns))
+        return "\n\n".join(parts) or "(no previous messages)"
+
+    def record(self, prompt_tokens: int, latency_seconds: float) -> dict:
+        """Track prompt size and latency of one chat turn"""
+        stats = {
+            "turn": len(self.turn_stats) + 1,
+            "prompt_tokens": prompt_tokens,
+            "memory_tokens": self.tokens(),
+            "latency_seconds": round(latency_seconds, 2),
+        }
+        self.turn_stats.append(stats)
+        return stats
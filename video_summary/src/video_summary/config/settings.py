@@ -0,0 +1,102 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a true/false flag from the environment"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class AppConfig:
+    """Application settings, overridable through environment variables or the .env file"""
+
+    # Whisper model size. Options: tiny, base, small, medium, large
+    WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "small")
+
+    # Device selection
+    FORCE_CPU = _env_flag("FORCE_CPU", False)
+    ENABLE_GPU = _env_flag("ENABLE_GPU", True)
+
+    # Windowed transcription: audio is decoded and transcribed in fixed-size
+    # windows so peak memory does not grow with the length of the recording.
+    WINDOWED_TRANSCRIPTION = _env_flag("WINDOWED_TRANSCRIPTION", True)
+    WINDOW_SECONDS = int(os.environ.get("WINDOW_SECONDS", "600"))
+    WINDOW_OVERLAP_SECONDS = int(os.environ.get("WINDOW_OVERLAP_SECONDS", "5"))
+
+    # Memory budget for the audio buffers of a single job (the model is not included)
+    JOB_MEMORY_BUDGET_MB = int(os.environ.get("JOB_MEMORY_BUDGET_MB", "256"))
+
+    # Uploads are written to disk in chunks of this size
+    UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "temp_audio")
+    UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+    # Per-job outputs (transcript segments, cached chunk summaries, ...) live under JOBS_DIR/<job_id>
+    JOBS_DIR = os.environ.get("JOBS_DIR", "jobs")
+
+    # LLM used outside of the crews, e.g. for time-range summaries
+    LLM_MODEL = os.environ.get("MODEL")
+    SUMMARY_CHUNK_SECONDS = int(os.environ.get("SUMMARY_CHUNK_SECONDS", "300"))
+
+    # Shared transcription service (transcription_service.py). When TRANSCRIPTION_SERVICE_URL
+    # is set, the transcriber tools send audio to it instead of loading Whisper in-process.
+    TRANSCRIPTION_SERVICE_URL = os.environ.get("TRANSCRIPTION_SERVICE_URL")
+    TRANSCRIPTION_SERVICE_TIMEOUT = int(os.environ.get("TRANSCRIPTION_SERVICE_TIMEOUT", "7200"))
+    SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT = int(os.environ.get("SERVICE_PORT", "8765"))
+    SERVICE_MAX_BATCH_SIZE = int(os.environ.get("SERVICE_MAX_BATCH_SIZE", "8"))
+    SERVICE_MAX_WAIT_MS = int(os.environ.get("SERVICE_MAX_WAIT_MS", "50"))
+
+    # Chat memory: recent turns are kept verbatim and older ones are compacted into a
+    # rolling summary so the history never takes more than CHAT_MEMORY_TOKENS tokens.
+    CHAT_MEMORY_TOKENS = int(os.environ.get("CHAT_MEMORY_TOKENS", "1500"))
+
+    # Web search cache used by the info_finder agent
+    SERPER_URL = os.environ.get("SERPER_URL", "https://google.serper.dev/search")
+    SEARCH_RESULTS = int(os.environ.get("SEARCH_RESULTS", "5"))
+    SEARCH_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", os.path.join("cache", "search_cache.db"))
+    SEARCH_CACHE_TTL_SECONDS = int(os.environ.get("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+    SEARCH_QUOTA_PER_MINUTE = int(os.environ.get("SEARCH_QUOTA_PER_MINUTE", "30"))
+
+    # Language routing: caption tracks are tried in the summary language first, then in
+    # CAPTION_LANGUAGES; Whisper detects the spoken language once on a short probe window.
+    CAPTION_LANGUAGES = [code.strip() for code in os.environ.get("CAPTION_LANGUAGES", "fr,en").split(",") if code.strip()]
+    TRANSLATE_CAPTIONS = _env_flag("TRANSLATE_CAPTIONS", True)
+    LANGUAGE_PROBE_OFFSET_SECONDS = int(os.environ.get("LANGUAGE_PROBE_OFFSET_SECONDS", "30"))
+
+    # Archive of completed summaries (SQLite with full-text search)
+    ARCHIVE_PATH = os.environ.get("ARCHIVE_PATH", os.path.join("cache", "summary_archive.db"))
+    ARCHIVE_LIST_SIZE = int(os.environ.get("ARCHIVE_LIST_SIZE", "15"))
+
+    # Deterministic clean-up (repeated caption lines, fillers, noise tags) before summarization
+    COMPACT_TRANSCRIPTS = _env_flag("COMPACT_TRANSCRIPTS", True)
+
+    # Transcripts longer than this are summarized chunk by chunk before the final summary
+    MAX_TRANSCRIPT_TOKENS = int(os.environ.get("MAX_TRANSCRIPT_TOKENS", "30000"))
+
+    # Failed pipeline runs are retried, resuming from the last checkpointed stage
+    PIPELINE_ATTEMPTS = int(os.environ.get("PIPELINE_ATTEMPTS", "3"))
+
+    # Background execution: pipeline and chat jobs run on bounded worker pools shared by all
+    # sessions, and the UI polls their status every STATUS_POLL_SECONDS instead of blocking.
+    MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", "2"))
+    MAX_CONCURRENT_CHATS = int(os.environ.get("MAX_CONCURRENT_CHATS", "8"))
+    STATUS_POLL_SECONDS = float(os.environ.get("STATUS_POLL_SECONDS", "1"))
+    JOB_STATUS_TTL_SECONDS = int(os.environ.get("JOB_STATUS_TTL_SECONDS", "3600"))
+
+    # CPU slots for in-process transcription: at most TRANSCRIPTION_SLOTS transcriptions run at
+    # once, each with THREADS_PER_SLOT torch threads (0 = cores / slots), optionally pinned to
+    # their own cores (Linux only). TRANSCRIPTION_SLOTS = 0 uses MAX_CONCURRENT_JOBS.
+    TRANSCRIPTION_SLOTS = int(os.environ.get("TRANSCRIPTION_SLOTS", "0"))
+    THREADS_PER_SLOT = int(os.environ.get("THREADS_PER_SLOT", "0"))
+    PIN_CPU_CORES = _env_flag("PIN_CPU_CORES", False)
+
+    # Pipeline profile (config/pipeline.yaml) used when a job does not pick one
+    PIPELINE_PROFILE = os.environ.get("PIPELINE_PROFILE", "balanced")
+
+    # MP3 bitrate (kbps) of downloaded YouTube audio; Whisper resamples to 16 kHz mono anyway
+    AUDIO_QUALITY = os.environ.get("AUDIO_QUALITY", "192")
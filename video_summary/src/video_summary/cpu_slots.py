@@ -0,0 +1,98 @@
+import os
+import threading
+from contextlib import contextmanager
+import torch
+from config.settings import AppConfig
+
+# os.sched_setaffinity only exists on Linux
+AFFINITY_SUPPORTED = hasattr(os, "sched_setaffinity")
+
+
+def available_cores() -> list:
+    """Cores this process may run on"""
+    if AFFINITY_SUPPORTED:
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class CpuSlot:
+    def __init__(self, index: int, threads: int, cores: list):
+        self.index = index
+        self.threads = threads
+        self.cores = cores
+
+
+class CpuSlots:
+    """
+    A fixed number of concurrent transcription slots, each with its own number of torch
+    intra-op threads and, optionally, its own cores.
+
+    Without this every concurrent job lets torch start one thread per core and the
+    machine oversubscribes. A job holds a slot for the whole transcription; when all slots
+    are busy, acquire() waits for one to be released.
+    """
+
+    def __init__(self, slots: int = None, threads_per_slot: int = None, pin_cores: bool = None, cores: list = None):
+        cores = cores or available_cores()
+        slots = max(1, slots or AppConfig.TRANSCRIPTION_SLOTS or AppConfig.MAX_CONCURRENT_JOBS)
+        threads = max(1, threads_per_slot or AppConfig.THREADS_PER_SLOT or len(cores) // slots)
+        self.pin_cores = AFFINITY_SUPPORTED and (AppConfig.PIN_CPU_CORES if pin_cores is None else pin_cores)
+        # Consecutive cores per slot; slots wrap around when slots * threads exceeds the core count
+        self.slots = [
+            CpuSlot(i, threads, [cores[(i * threads + j) % len(cores)] for j in range(threads)])
+            for i in range(slots)
+        ]
+        self.free = list(self.slots)
+        self.condition = threading.Condition()
+        self.local = threading.local()
+
+    def _take(self) -> CpuSlot:
+        with self.condition:
+            self.condition.wait_for(lambda: self.free)
+            # Prefer the slot this thread held last: torch's worker threads keep the cores
+            # they were started on, so switching slots would leave them on the old ones
+            last = getattr(self.local, "last", None)
+            slot = last if last in self.free else self.free[0]
+            self.free.remove(slot)
+            self.local.last = slot
+            return slot
+
+    def _give_back(self, slot: CpuSlot) -> None:
+        with self.condition:
+            self.free.append(slot)
+            self.condition.notify()
+
+    @contextmanager
+    def acquire(self):
+        """Hold a slot, with torch threads and core affinity set for the calling thread"""
+        slot = self._take()
+        previous_threads = torch.get_num_threads()
+        previous_cores = os.sched_getaffinity(0) if self.pin_cores else None
+        try:
+            torch.set_num_threads(slot.threads)
+            if self.pin_cores:
+                # pid 0 is the calling thread; threads and subprocesses it starts (ffmpeg) inherit the mask
+                os.sched_setaffinity(0, slot.cores)
+            yield slot
+        finally:
+            torch.set_num_threads(previous_threads)
+            if previous_cores is not None:
+                os.sched_setaffinity(0, previous_cores)
+            self._give_back(slot)
+
+    def describe(self) -> str:
+        pinned = "pinned" if self.pin_cores else "unpinned"
+        return f"{len(self.slots)} slots x {self.slots[0].threads} threads ({pinned})"
+
+
+_cpu_slots = None
+_cpu_slots_lock = threading.Lock()
+
+
+def get_cpu_slots() -> CpuSlots:
+    """The process-wide slots shared by all in-process transcriptions"""
+    global _cpu_slots
+    with _cpu_slots_lock:
+        if _cpu_slots is None:
+            _cpu_slots = CpuSlots()
+        return _cpu_slots
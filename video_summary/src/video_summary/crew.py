@@ -1,17 +1,24 @@
-from crewai import Agent, Crew, Process, Task
+from crewai import Agent, Crew, LLM, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from crewai_tools import FileWriterTool
-from typing import List
-import yt_dlp
-import urllib.parse
+from typing import List, Optional, Type
 import json
-from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
-import whisper
+import math
 import os
-from crewai_tools import SerperDevTool
-from crewai.tools import tool
+import time
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from transcription import get_device, transcribe_file
+from job_store import JobStore, make_job_id, format_transcript
+from tools.search_cache_tool import CachedSearchTool
+from youtube import is_youtube_url, prefetch_youtube, format_metadata_header
+from transcript_compaction import CAPTIONS, WHISPER, compact_segments, compaction_report
+from config.settings import AppConfig
+from chat_memory import estimate_tokens
+from range_summary import COMPACTED, TRANSCRIPT, summarize_all_chunks
+from pipeline import PipelineProfile, get_profile, job_profile, task_prompt
 
 # Dynamic FFmpeg path detection
 def setup_ffmpeg_path():
@@ -54,8 +61,26 @@ def setup_ffmpeg_path():
 # Setup FFmpeg path
 ffmpeg_path = setup_ffmpeg_path()
 
+# File the filewriter agent writes the final summary to, in the job directory
+SUMMARY_FILE = "Video_Summary.txt"
+
+# Files in the job directory produced by each pipeline stage
+STAGE_OUTPUTS = {
+    "transcription": ("transcript.json", "transcription_windows.json"),
+    "summary": ("summary.md", "chunk_summaries.json", "compaction.json"),
+    "render": (SUMMARY_FILE,),
+}
+
+# Checkpoints in checkpoints.json recorded while each pipeline stage runs
+STAGE_CHECKPOINTS = {
+    "transcription": ("download", "decode"),
+    "summary": ("summary",),
+    "render": ("render",),
+}
+
 # Use default device detection (Whisper will choose the best available device)
-DEVICE = None
+# unless FORCE_CPU / ENABLE_GPU say otherwise
+DEVICE = get_device()
 # print("Using default device detection for transcription")
 
 # If you want to run a snippet of code before or after the crew starts,
@@ -78,145 +103,202 @@ def test_whisper_transcription(audio_file_path: str) -> str:
         # print(f"Testing Whisper transcription with file: {audio_file_path}")
         # print(f"File exists: {os.path.exists(audio_file_path)}")
         
-        whisper_model = whisper.load_model("small", device=DEVICE)
-        # print(f"Whisper model loaded successfully")
-        
         # print("Starting transcription...")
-        result = whisper_model.transcribe(audio_file_path)
+        result = transcribe_file(audio_file_path, device=DEVICE)
         # print(f"Transcription completed successfully")
         
         return result["text"]
     except Exception as e:
         return f"Error during transcription: {str(e)}"
 
-@tool("Audio Transcribe Tool")
-def audio_transcriber_tool(input_str: str) -> str:
+def store_transcript(store: JobStore, segments: list, metadata: dict = None, language: str = None) -> str:
+    """Save a fresh transcript verbatim with the job and render it as the tool output"""
+    if metadata is not None:
+        store.save_json("metadata.json", metadata)
+    store.save_transcript(segments)
+    return transcript_for_summary(store, segments, metadata, language)
+
+def transcript_for_summary(store: JobStore, segments: list, metadata: dict = None, language: str = None) -> str:
+    """
+    Render the transcript for the summarizer, compacted when COMPACT_TRANSCRIPTS is on (the
+    token reduction is recorded in the job's compaction.json). Transcripts over
+    MAX_TRANSCRIPT_TOKENS are replaced by checkpointed per-chunk summaries, written in the
+    summary `language`, so the summarizer gets a bounded input.
     """
-    Extracts transcript from a YouTube video given its URL or transcribes an audio file.
-    Uses YouTube's transcript API for YouTube videos or Whisper for audio files.
+    profile = job_profile(store)
+    source = TRANSCRIPT
+    if profile.setting("COMPACT_TRANSCRIPTS"):
+        compacted = compact_segments(segments, (metadata or {}).get("transcript_source", WHISPER))
+        store.save_json("compaction.json", compaction_report(segments, compacted))
+        segments, source = compacted, COMPACTED
+    text = format_transcript(segments)
+    if estimate_tokens(text) > profile.setting("MAX_TRANSCRIPT_TOKENS"):
+        text = "Section summaries of a long transcript:\n\n" + summarize_all_chunks(
+            store.job_id,
+            chunk_seconds=profile.setting("SUMMARY_CHUNK_SECONDS"),
+            workers=profile.stage("summary").get("workers", 1),
+            segments=segments,
+            source=source,
+            language=language,
+        )
+    return format_metadata_header(metadata) + text
 
-    Parameters:
-    - input_str (str): A JSON string containing either a YouTube URL or audio file path.
+def reset_stages(store: JobStore, *names: str) -> None:
+    """Drop the output files and checkpoints of pipeline stages so they run again"""
+    for name in names:
+        store.remove_files(*STAGE_OUTPUTS[name])
+        store.clear_stages(*STAGE_CHECKPOINTS[name])
 
-    Returns:
-    str: The transcribed text from the YouTube video or audio file.
-    """
-    # print(f"Received input: {input_str}")
-    
-    def extract_video_id(url):
-        parsed_url = urllib.parse.urlparse(url)
-        hostname = parsed_url.hostname.lower() if parsed_url.hostname else ''
-        if 'youtu.be' in hostname:
-            return parsed_url.path[1:]
-        elif 'youtube.com' in hostname:
-            if parsed_url.path == '/watch':
-                query = urllib.parse.parse_qs(parsed_url.query)
-                return query.get('v', [None])[0]
-            elif parsed_url.path.startswith(('/embed/', '/v/')):
-                return parsed_url.path.split('/')[2]
-        return None
+def remove_job_audio(store: JobStore) -> None:
+    """Drop the downloaded and decoded audio once the transcript is safely stored"""
+    for name in ("audio_file.mp3", "audio_16k.wav"):
+        if os.path.exists(store.file_path(name)):
+            os.remove(store.file_path(name))
 
-    def get_youtube_transcription(url: str) -> str:
-        video_id = extract_video_id(url)
-        if not video_id:
-            return None
+def transcribe_content(content: str, language: str = None, job_id: str = None) -> str:
+    """
+    Transcribe a YouTube URL or an audio file with the settings of the job's pipeline profile,
+    reusing whatever an earlier attempt already produced. The transcript is stored in the
+    `job_id` job, by default the one derived from `content`. `language` is the summary
+    language: captions in it are preferred, and long transcripts are chunk-summarized in it.
 
-        try:
-            transcript_data = YouTubeTranscriptApi().fetch(video_id, languages=['fr', 'en'])
-            # print(f"Received transcript: {transcript_data}")
-            return ' '.join([snippet.text for snippet in transcript_data.snippets])
-        except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable):
-            return None
+    Returns:
+        str: The transcript as paragraphs prefixed with [hh:mm:ss] timestamps
 
-    def is_youtube_url(text: str) -> bool:
-        """Check if the input is a YouTube URL"""
-        return 'youtube.com' in text or 'youtu.be' in text
+    Raises:
+        Exception: If the input cannot be found, downloaded or transcribed; the message is
+            also recorded in the job's error.json
+    """
+    if not is_youtube_url(content) and not os.path.exists(content):
+        raise FileNotFoundError(f"File not found at {content}")
 
+    store = JobStore(job_id or make_job_id(content))
     try:
-        if input_str.strip().startswith('{'):
-            inputs = json.loads(input_str)
-            content = inputs.get('content') or inputs.get('url') or inputs.get('input_str') or inputs.get('youtube_url') or inputs.get('audio_file_path')
-            if content is None:
-                raise ValueError("Content is required in the input JSON.")
-        else:
-            content = input_str.strip()
-            if not content:
-                raise ValueError("Input content is empty.")
+        # Reuse the transcript if this input has been transcribed before
+        segments = store.load_transcript()
+        if segments:
+            store.record_reuse("transcript")
+            return transcript_for_summary(store, segments, store.load_json("metadata.json"), language)
+
+        profile = job_profile(store)
+        whisper_options = {
+            "model_name": profile.setting("WHISPER_MODEL"),
+            "overlap_seconds": profile.setting("WINDOW_OVERLAP_SECONDS"),
+        }
 
         # Check if it's a YouTube URL or file path
         if is_youtube_url(content):
             # print(f"Processing YouTube URL: {content}")
-            # Get transcript from YouTube
-            youtube_transcription = get_youtube_transcription(content)
-            if youtube_transcription:
-                return youtube_transcription
+            audio_file = store.file_path("audio_file.mp3")
+            metadata = store.load_json("metadata.json")
+            if store.stage_done("download") and os.path.exists(audio_file) and metadata is not None:
+                # An earlier attempt already downloaded the audio and found no captions
+                store.record_reuse("download", audio_seconds=metadata.get("duration") or 0)
+            else:
+                # Captions, metadata and audio are fetched concurrently; the audio
+                # download is cancelled as soon as usable captions arrive
+                prefetched = prefetch_youtube(content, store.path, language, profile.setting("AUDIO_QUALITY"))
+                metadata = prefetched["metadata"]
+
+                if prefetched["segments"]:
+                    metadata["language"] = prefetched["caption_language"]
+                    metadata["transcript_source"] = CAPTIONS
+                    output = store_transcript(store, prefetched["segments"], metadata, language)
+                    # The audio download may have finished before captions arrived and cancelled it
+                    remove_job_audio(store)
+                    return output
+
+                audio_file = prefetched["audio_file"]
+                store.save_json("metadata.json", metadata)
+                store.mark_stage("download")
 
             # If no subtitles, proceed with Whisper transcription
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-                'outtmpl': 'audio_file.%(ext)s',
-                'quiet': True,
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([content])
-
-            audio_file = "audio_file.mp3"
-            whisper_model = whisper.load_model("small", device=DEVICE)
-            result = whisper_model.transcribe(audio_file)
+            result = transcribe_file(
+                audio_file, device=DEVICE, duration=metadata.get("duration"), store=store, **whisper_options
+            )
             # print(f"Transcription completed")
-
-            os.remove(audio_file)
-            return result["text"]
+            metadata["language"] = result.get("language")
+            metadata["transcript_source"] = WHISPER
         else:
             # Treat as audio file path
             # print(f"Processing audio file: {content}")
-            if not os.path.exists(content):
-                return f"Error: File not found at {content}"
-            
-            whisper_model = whisper.load_model("small", device=DEVICE)
-            # print(f"Whisper model loaded successfully for file transcription.")
-            
-            # print("Starting transcription of file...")
-            result = whisper_model.transcribe(content)
-            # print(f"File transcription completed successfully.")
-            
-            return result["text"]
-            
-    except Exception as e:
-        return f"Error downloading or transcribing audio: {e}"
+            result = transcribe_file(content, device=DEVICE, store=store, **whisper_options)
+            metadata = {"language": result.get("language"), "transcript_source": WHISPER}
 
-@tool("Audio File Transcribe Tool")
-def audio_file_transcriber_tool(file_path: str) -> str:
-    """
-    Transcribes an audio file to text using Whisper.
-
-    Parameters:
-    - file_path (str): The path to the audio file to be transcribed.
-
-    Returns:
-    str: The transcribed text of the audio file.
-    """
-    try:
-        # print(f"Transcribing audio file: {file_path}")
-        if not os.path.exists(file_path):
-            return f"Error: File not found at {file_path}"
-        
-        whisper_model = whisper.load_model("small", device=DEVICE)
-        # print(f"Whisper model loaded successfully for file transcription.")
-        
-        # print("Starting transcription of file...")
-        result = whisper_model.transcribe(file_path)
-        # print(f"File transcription completed successfully.")
-        
-        return result["text"]
+        output = store_transcript(store, result["segments"], metadata, language)
+        remove_job_audio(store)
+        return output
     except Exception as e:
-        return f"Error during file transcription: {str(e)}"
+        store.record_error("transcription", str(e))
+        raise
+
+class AudioTranscriberToolInput(BaseModel):
+    """Input schema for AudioTranscriberTool."""
+    input_str: str = Field(
+        ...,
+        description='A JSON string containing either a YouTube URL or audio file path as "content", '
+                    'and optionally the summary language code as "language" (used to pick YouTube captions).',
+    )
+
+class AudioTranscriberTool(BaseTool):
+    name: str = "Audio Transcribe Tool"
+    description: str = (
+        "Extracts transcript from a YouTube video given its URL or transcribes an audio file. "
+        "Uses YouTube's transcript API for YouTube videos or Whisper for audio files. Returns the "
+        "transcribed text as paragraphs prefixed with [hh:mm:ss] timestamps."
+    )
+    args_schema: Type[BaseModel] = AudioTranscriberToolInput
+    # Job the transcript is stored in and its summary language; the agent's argument only
+    # says what to transcribe
+    job_id: Optional[str] = None
+    language: Optional[str] = None
+
+    def _run(self, input_str: str) -> str:
+        # print(f"Received input: {input_str}")
+
+        try:
+            language = self.language
+            if input_str.strip().startswith('{'):
+                inputs = json.loads(input_str)
+                content = inputs.get('content') or inputs.get('url') or inputs.get('input_str') or inputs.get('youtube_url') or inputs.get('audio_file_path')
+                language = inputs.get('language') or language
+                if content is None:
+                    raise ValueError("Content is required in the input JSON.")
+            else:
+                content = input_str.strip()
+                if not content:
+                    raise ValueError("Input content is empty.")
+
+            return transcribe_content(content, language, self.job_id)
+        except FileNotFoundError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error downloading or transcribing audio: {e}"
+
+class AudioFileTranscriberToolInput(BaseModel):
+    """Input schema for AudioFileTranscriberTool."""
+    file_path: str = Field(..., description="The path to the audio file to be transcribed.")
+
+class AudioFileTranscriberTool(BaseTool):
+    name: str = "Audio File Transcribe Tool"
+    description: str = (
+        "Transcribes an audio file to text using Whisper. Returns the transcribed text as "
+        "paragraphs prefixed with [hh:mm:ss] timestamps."
+    )
+    args_schema: Type[BaseModel] = AudioFileTranscriberToolInput
+    # Job the transcript is stored in and its summary language; the agent's argument only
+    # says what to transcribe
+    job_id: Optional[str] = None
+    language: Optional[str] = None
+
+    def _run(self, file_path: str) -> str:
+        try:
+            # print(f"Transcribing audio file: {file_path}")
+            return transcribe_content(file_path, self.language, self.job_id)
+        except FileNotFoundError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error during file transcription: {str(e)}"
 
 @CrewBase
 class VideoSummary():
@@ -225,8 +307,12 @@ class VideoSummary():
     tasks: List[Task]
 
     def __init__(self):
-        self.audio_tool = [audio_transcriber_tool, audio_file_transcriber_tool]
+        self.audio_tool = [AudioTranscriberTool(), AudioFileTranscriberTool()]
         self.summaryReport = ""
+        # Job whose stages are checkpointed by the task callbacks, set by run_summarization
+        self.job_store = None
+        # When the running stage started, to tell its files from those of earlier runs
+        self.stage_started = 0.0
 
     @agent
     def transcriber(self) -> Agent:
@@ -272,7 +358,7 @@ class VideoSummary():
     def info_finder(self) -> Agent:
         return Agent(
             config=self.agents_config['info_finder'],
-            tools=[SerperDevTool()],
+            tools=[CachedSearchTool()],
             verbose=True
         )
 
@@ -281,25 +367,51 @@ class VideoSummary():
     def filewriter(self) -> Agent:
         return Agent(
             config=self.agents_config['filewriter'], 
-            tools=[FileWriterTool(file_path='Video_Summary.txt')], 
+            tools=[FileWriterTool()], 
             verbose=True)
 
     @task
     def transcription_task(self) -> Task:
         return Task(
             config=self.tasks_config['transcription_task'], 
-            tools=self.audio_tool)
+            tools=self.audio_tool,
+            callback=self.checkpoint_transcription)
 
     @task
     def summary_task(self) -> Task:
         return Task(
             config=self.tasks_config['summary_task'], 
-            tools=[])
+            tools=[],
+            callback=self.checkpoint_summary)
 
     @task
     def file_write_task(self) -> Task:
         return Task(
-            config=self.tasks_config['file_write_task'])
+            config=self.tasks_config['file_write_task'],
+            callback=self.checkpoint_render)
+
+    def checkpoint_transcription(self, output) -> None:
+        """Stop the crew if the tools did not produce a transcript, rather than summarizing an error"""
+        if self.job_store is not None and self.job_store.load_transcript() is None:
+            error = self.job_store.load_json("error.json", {})
+            raise RuntimeError(f"Transcription failed: {error.get('message', 'no transcript was produced')}")
+
+    def checkpoint_summary(self, output) -> None:
+        if self.job_store is not None:
+            self.save_summary(output.raw)
+
+    def save_summary(self, summary: str) -> None:
+        with open(self.job_store.file_path("summary.md"), "w", encoding="utf-8") as f:
+            f.write(summary)
+        self.job_store.mark_stage("summary")
+
+    def checkpoint_render(self, output) -> None:
+        if self.job_store is None:
+            return
+        path = self.job_store.file_path(SUMMARY_FILE)
+        # Only a file written by this run counts (mtime may have a one-second resolution)
+        if os.path.exists(path) and os.path.getmtime(path) >= math.floor(self.stage_started):
+            self.job_store.mark_stage("render")
 
     @task
     def chat_task(self) -> Task:
@@ -311,17 +423,136 @@ class VideoSummary():
             config=self.tasks_config['info_task']
         )
 
-    def create_summarization_crew(self) -> Crew:
+    def stage_task(self, stage: dict, previous_output: str = None, label: str = None) -> Task:
+        """
+        The task of an agent stage. When the stage before it did not run as an agent of the
+        same crew, its output is appended to the description as `{previous_output}`.
+        """
+        task = getattr(self, stage["task"])()
+        if previous_output is None:
+            return task
+        config = self.tasks_config[stage["task"]]
+        return Task(
+            config=config,
+            description=config["description"] + f"\n\n{label}:\n{{previous_output}}",
+            tools=task.tools,
+            callback=task.callback,
+        )
+
+    def create_stage_crew(self, profile, names: list, previous_output: str = None, label: str = None) -> Crew:
         """
-        Creates the crew responsible for transcription, summarization, and file writing.
+        Creates the crew for consecutive agent stages of the pipeline, e.g. transcriber,
+        summarizer and filewriter for the default profile.
         """
+        stages = [profile.stage(name) for name in names]
         return Crew(
-            agents=[self.transcriber(), self.summarizer(), self.filewriter()],
-            tasks=[self.transcription_task(), self.summary_task(), self.file_write_task()],
+            agents=[getattr(self, stage["agent"])() for stage in stages],
+            tasks=[
+                self.stage_task(stage, previous_output if i == 0 else None, label)
+                for i, stage in enumerate(stages)
+            ],
             process=Process.sequential,
             verbose=True,
         )
 
+    def prepare_job(self, store: JobStore, profile) -> None:
+        """
+        Save the job's profile and drop the checkpoints it cannot reuse: those of stages with
+        caching off or made with other settings, and those of every stage after them.
+        """
+        previous = store.load_json("pipeline.json")
+        previous = PipelineProfile.from_json(previous) if previous else None
+        names = list(profile.stages)
+        for i, name in enumerate(names):
+            stale = not profile.stage(name).get("cache", True)
+            if previous is not None and previous.signature(name) != profile.signature(name):
+                stale = True
+            if stale:
+                reset_stages(store, *names[i:])
+                break
+        store.save_json("pipeline.json", profile.to_json())
+
+    def stage_output(self, store: JobStore, name: str, language: str = None):
+        """The checkpointed output of a stage, or None if it has to run"""
+        if name == "transcription":
+            segments = store.load_transcript()
+            if segments:
+                return transcript_for_summary(store, segments, store.load_json("metadata.json"), language)
+        elif name == "summary":
+            if store.stage_done("summary") and os.path.exists(store.file_path("summary.md")):
+                with open(store.file_path("summary.md"), "r", encoding="utf-8") as f:
+                    return f.read()
+        elif store.stage_done("render") and os.path.exists(store.file_path(SUMMARY_FILE)):
+            return store.file_path(SUMMARY_FILE)
+        return None
+
+    def run_code_stage(self, profile, name: str, inputs: dict, previous_output: str) -> str:
+        """Run a stage that is not implemented by an agent"""
+        if name == "transcription":
+            return transcribe_content(inputs["content"], inputs.get("language"), self.job_store.job_id)
+        if name == "summary":
+            prompt = task_prompt(
+                self.tasks_config[profile.stage(name)["task"]], inputs, previous_output, "TRANSCRIPT"
+            )
+            summary = LLM(model=AppConfig.LLM_MODEL).call([{"role": "user", "content": prompt}])
+            self.save_summary(summary)
+            return summary
+        # render: the summary is written as the summarizer produced it
+        with open(inputs["summary_file"], "w", encoding="utf-8") as f:
+            f.write(previous_output)
+        self.job_store.mark_stage("render")
+        return inputs["summary_file"]
+
+    def run_summarization(self, inputs: dict, job_id: str, profile_name: str = None) -> str:
+        """
+        Run the stages of a pipeline profile (config/pipeline.yaml) for a job. Stages whose
+        checkpoints are still valid are skipped, consecutive agent stages run as one crew,
+        and the others run directly. Transcription also resumes inside the tools.
+
+        Returns:
+            str: Path of the job's rendered summary
+        """
+        store = JobStore(job_id)
+        profile = get_profile(profile_name, inputs.get("language"))
+        self.prepare_job(store, profile)
+        # Each job writes its own file, so concurrent jobs never overwrite each other's summary
+        rendered = store.file_path(SUMMARY_FILE)
+        inputs = dict(inputs, summary_file=os.path.abspath(rendered))
+        self.job_store = store
+        # The transcription tools store into this job whatever input string the agent passes
+        # them, rather than a job derived from that string
+        for audio_tool in self.audio_tool:
+            audio_tool.job_id = job_id
+            audio_tool.language = inputs.get("language")
+
+        names = list(profile.stages)
+        start, previous_output = 0, None
+        for i in range(len(names) - 1, -1, -1):
+            output = self.stage_output(store, names[i], inputs.get("language"))
+            if output is not None:
+                store.record_reuse(names[i])
+                start, previous_output = i + 1, output
+                break
+
+        while start < len(names):
+            started = self.stage_started = time.time()
+            if profile.implementation(names[start]) == "agent":
+                end = start
+                while end < len(names) and profile.implementation(names[end]) == "agent":
+                    end += 1
+                label = names[start - 1].upper() if start > 0 else None
+                crew = self.create_stage_crew(profile, names[start:end], previous_output, label)
+                previous_output = crew.kickoff(inputs=dict(inputs, previous_output=previous_output or "")).raw
+            else:
+                end = start + 1
+                previous_output = self.run_code_stage(profile, names[start], inputs, previous_output)
+            store.record_timing("+".join(names[start:end]), time.time() - started)
+            start = end
+
+        if not (os.path.exists(rendered) and store.stage_done("render")):
+            raise RuntimeError("The summary file was not written")
+        return rendered
+
     def create_chat_crew(self) -> Crew:
         """
         Creates the crew responsible for handling chat interactions.
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import AppConfig
+
+# Job states, in the order a job goes through them
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded pool of worker threads, off the Streamlit script thread.
+
+    The UI submits a job, keeps its ID and polls status(), which only reads an in-memory
+    snapshot, so a rerun never waits on pipeline work. One manager is shared by every
+    session of the server.
+    """
+
+    def __init__(self, max_workers: int = None, name: str = "job"):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or AppConfig.MAX_CONCURRENT_JOBS, thread_name_prefix=name
+        )
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.group_locks = {}
+
+    def submit(self, job_id: str, fn, *args, **kwargs) -> str:
+        """Queue `fn(*args, **kwargs)` under `job_id`; a job already queued or running is not submitted twice"""
+        with self.lock:
+            self._prune()
+            job = self.jobs.get(job_id)
+            if job is not None and job["state"] in (QUEUED, RUNNING):
+                return job_id
+            job = {
+                "state": QUEUED,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self.jobs[job_id] = job
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job: dict, fn, args: tuple, kwargs: dict) -> None:
+        with self.lock:
+            job["state"] = RUNNING
+            job["started_at"] = time.time()
+        try:
+            result = fn(*args, **kwargs)
+            update = {"state": DONE, "result": result}
+        except Exception as e:
+            update = {"state": FAILED, "error": str(e)}
+        with self.lock:
+            job.update(update, finished_at=time.time())
+
+    def _prune(self) -> None:
+        # Forget finished jobs nobody polled for a while so the table does not grow forever
+        cutoff = time.time() - AppConfig.JOB_STATUS_TTL_SECONDS
+        for job_id in [
+            job_id for job_id, job in self.jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]:
+            del self.jobs[job_id]
+
+    def status(self, job_id: str) -> dict:
+        """Snapshot of a job's state, or None if the job is unknown; never blocks on the job itself"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return None if job is None else dict(job)
+
+    def active(self, prefix: str) -> dict:
+        """Snapshots of the queued and running jobs whose ID starts with `prefix`"""
+        with self.lock:
+            return {
+                job_id: dict(job) for job_id, job in self.jobs.items()
+                if job_id.startswith(prefix) and job["state"] in (QUEUED, RUNNING)
+            }
+
+    def group_lock(self, group: str) -> threading.Lock:
+        """A lock shared by the jobs of `group`, for work they must not do at the same time"""
+        with self.lock:
+            if group not in self.group_locks:
+                self.group_locks[group] = threading.Lock()
+            return self.group_locks[group]
+
+    def metrics(self) -> dict:
+        with self.lock:
+            states = [job["state"] for job in self.jobs.values()]
+        return {state: states.count(state) for state in (QUEUED, RUNNING, DONE, FAILED)}
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from config.settings import AppConfig
+
+
+def make_job_id(content: str) -> str:
+    """
+    Derive a stable job ID from the pipeline input.
+
+    Local files are identified by their contents, so re-uploading the same audio maps to
+    the same job. Anything else (e.g. a YouTube URL) is identified by the input string.
+    """
+    digest = hashlib.sha1()
+    if os.path.isfile(content):
+        with open(content, "rb") as f:
+            for block in iter(lambda: f.read(AppConfig.UPLOAD_CHUNK_SIZE), b""):
+                digest.update(block)
+    else:
+        digest.update(content.strip().encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as hh:mm:ss"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse 'ss', 'mm:ss' or 'hh:mm:ss' into seconds"""
+    seconds = 0.0
+    for part in value.strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_transcript(segments: list, paragraph_seconds: int = 60) -> str:
+    """
+    Render segments as timestamped paragraphs, one timestamp per paragraph of
+    roughly `paragraph_seconds` so the timing costs few tokens.
+    """
+    paragraphs = []
+    current = []
+    paragraph_start = None
+    for segment in segments:
+        if paragraph_start is None:
+            paragraph_start = segment["start"]
+        elif segment["start"] - paragraph_start >= paragraph_seconds:
+            paragraphs.append(f"[{format_timestamp(paragraph_start)}] " + " ".join(current))
+            current = []
+            paragraph_start = segment["start"]
+        current.append(segment["text"].strip())
+    if current:
+        paragraphs.append(f"[{format_timestamp(paragraph_start)}] " + " ".join(current))
+    return "\n\n".join(paragraphs)
+
+
+_job_locks = {}
+_job_locks_lock = threading.Lock()
+
+
+def get_job_lock(path: str) -> threading.Lock:
+    """The lock serializing read-modify-write updates of one job directory's files"""
+    path = os.path.abspath(path)
+    with _job_locks_lock:
+        if path not in _job_locks:
+            _job_locks[path] = threading.Lock()
+        return _job_locks[path]
+
+
+class JobStore:
+    """File-backed storage for everything produced while processing one input"""
+
+    def __init__(self, job_id: str, root: str = None):
+        self.job_id = job_id
+        self.path = os.path.join(root or AppConfig.JOBS_DIR, job_id)
+        os.makedirs(self.path, exist_ok=True)
+        # Shared by every JobStore of this job, so concurrent chunk workers and stages
+        # never lose each other's updates to the same file
+        self.lock = get_job_lock(self.path)
+
+    def file_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def save_json(self, name: str, data) -> None:
+        # Write to a unique temporary file first so readers never see a half-written file
+        # and concurrent writers never write into the same temporary file
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.file_path(name))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def load_json(self, name: str, default=None):
+        try:
+            with open(self.file_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default
+
+    def save_transcript(self, segments: list) -> None:
+        """Store segments compactly as [start, end, text, avg_logprob] rows"""
+        rows = [
+            [
+                round(segment["start"], 2),
+                round(segment["end"], 2),
+                segment["text"].strip(),
+                None if segment.get("avg_logprob") is None else round(segment["avg_logprob"], 3),
+            ]
+            for segment in segments
+        ]
+        self.save_json("transcript.json", rows)
+
+    def load_transcript(self) -> list:
+        """Return the stored segments as dicts, or None if no transcript has been saved"""
+        rows = self.load_json("transcript.json")
+        if rows is None:
+            return None
+        return [
+            {"start": start, "end": end, "text": text, "avg_logprob": avg_logprob}
+            for start, end, text, avg_logprob in rows
+        ]
+
+    def get_chunk_summary(self, source: str, language: str, chunk_seconds: int, index: int):
+        """Cached summary of one chunk of the `source` segments, written in `language`"""
+        return self.load_json("chunk_summaries.json", {}).get(f"{source}:{language or ''}:{chunk_seconds}:{index}")
+
+    def save_chunk_summary(self, source: str, language: str, chunk_seconds: int, index: int, summary: str) -> None:
+        with self.lock:
+            summaries = self.load_json("chunk_summaries.json", {})
+            summaries[f"{source}:{language or ''}:{chunk_seconds}:{index}"] = summary
+            self.save_json("chunk_summaries.json", summaries)
+
+    def stage_done(self, stage: str) -> bool:
+        return stage in self.load_json("checkpoints.json", {})
+
+    def mark_stage(self, stage: str, **info) -> None:
+        """Checkpoint a completed pipeline stage so a retry can skip it"""
+        with self.lock:
+            checkpoints = self.load_json("checkpoints.json", {})
+            checkpoints[stage] = dict(info, completed_at=time.time())
+            self.save_json("checkpoints.json", checkpoints)
+
+    def clear_stages(self, *stages: str) -> None:
+        with self.lock:
+            checkpoints = self.load_json("checkpoints.json", {})
+            for stage in stages:
+                checkpoints.pop(stage, None)
+            self.save_json("checkpoints.json", checkpoints)
+
+    def record_reuse(self, stage: str, count: int = 1, audio_seconds: float = 0.0) -> None:
+        """Count work a retry or rerun did not have to redo"""
+        with self.lock:
+            metrics = self.load_json("metrics.json", {})
+            reused = metrics.setdefault("reused", {}).setdefault(stage, {"count": 0, "audio_seconds": 0.0})
+            reused["count"] += count
+            reused["audio_seconds"] = round(reused["audio_seconds"] + audio_seconds, 2)
+            self.save_json("metrics.json", metrics)
+
+    def record_timing(self, stage: str, seconds: float) -> None:
+        """Wall time of the last run of a stage"""
+        with self.lock:
+            metrics = self.load_json("metrics.json", {})
+            metrics.setdefault("timings", {})[stage] = round(seconds, 2)
+            self.save_json("metrics.json", metrics)
+
+    def remove_files(self, *names: str) -> None:
+        for name in names:
+            if os.path.exists(self.file_path(name)):
+                os.remove(self.file_path(name))
+
+    def record_error(self, stage: str, message: str) -> None:
+        self.save_json("error.json", {"stage": stage, "message": message, "at": time.time()})
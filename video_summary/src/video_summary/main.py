@@ -6,59 +6,261 @@ import streamlit as st
 from crewai import Crew
 import os
 import time
-import threading
+import tempfile
+import uuid
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from crew import VideoSummary
+from crew import VideoSummary, reset_stages
+from config.settings import AppConfig
+from job_store import JobStore, make_job_id, parse_timestamp, format_timestamp, format_transcript
+from job_manager import JobManager, QUEUED, RUNNING, DONE, FAILED
+from pipeline import profile_names, profile_description
+from range_summary import summarize_time_range
+from chat_memory import ConversationMemory, estimate_tokens
+from summary_archive import SummaryArchive
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 load_dotenv()
 
 
-def run_summarization(inputs, done_flag):
-    video_summary_crew = VideoSummary()
-    video_summary_crew.create_summarization_crew().kickoff(inputs=inputs)
-    done_flag['finished'] = True
+@st.cache_resource
+def get_archive():
+    return SummaryArchive()
 
 
-def show_progress_placebo(inputs, dark_mode):
-    st.title("🚀 Generating Summary")
-    progress_text = st.empty()
-    progress_bar = st.progress(0)
+@st.cache_resource
+def get_job_manager():
+    # Shared by every session, so the number of running pipelines is bounded server-wide
+    return JobManager(AppConfig.MAX_CONCURRENT_JOBS, name="pipeline")
 
-    done_flag = {'finished': False}
-    thread = threading.Thread(target=run_summarization, args=(inputs, done_flag))
-    thread.start()
 
-    progress = 0.0
-    text_color = "#ffffff" if dark_mode else "#000000"
-    success_color = "#66ff66" if dark_mode else "#006400"
+@st.cache_resource
+def get_chat_manager():
+    return JobManager(AppConfig.MAX_CONCURRENT_CHATS, name="chat")
 
-    while progress < 0.99 and not done_flag['finished']:
-        progress += 0.01
-        progress_bar.progress(progress)
-        progress_text.markdown(
-            f"<p style='color: {text_color}; font-weight: bold;'>Progress: {int(progress * 100)}%</p>",
-            unsafe_allow_html=True
-        )
-        time.sleep(0.1)
-
-    while not done_flag['finished']:
-        time.sleep(0.1)
 
-    progress_bar.progress(1.0)
-    progress_text.markdown(
-        f"<p style='color: {text_color}; font-weight: bold;'>Progress: 100%</p>",
-        unsafe_allow_html=True
-    )
-    st.markdown(
-        f"<p style='color: {success_color}; font-weight: bold;'>🎉 Task Completed!</p>",
-        unsafe_allow_html=True
+def archive_job(archive, job_id, source, summary_path, language):
+    """Archive the summary just written, with the job's transcript and metadata"""
+    with open(summary_path, "r", encoding="utf-8") as f:
+        summary_content = f.read()
+    store = JobStore(job_id)
+    segments = store.load_transcript()
+    archive.add(
+        job_id,
+        source,
+        summary_content,
+        transcript=format_transcript(segments) if segments else None,
+        metadata=dict(
+            store.load_json("metadata.json", {}),
+            profile=store.load_json("pipeline.json", {}).get("name"),
+            summary_language=language,
+        ),
     )
-    thread.join()
+
+
+def reset_chat():
     if 'messages' in st.session_state:
         del st.session_state['messages']
+    if 'chat_memory' in st.session_state:
+        del st.session_state['chat_memory']
+    if 'range_summary' in st.session_state:
+        del st.session_state['range_summary']
+
+
+def open_archived(job_id, summary_language=None):
+    """Show an archived summary without running the pipeline"""
+    entry = get_archive().get(job_id, summary_language)
+    if entry is None:
+        return
+    st.session_state.job_id = job_id
+    st.session_state.summary_content = entry["summary"]
+    reset_chat()
+
+
+def run_key(job_id, profile_name, language):
+    """Job manager ID of a pipeline run; the same input with another profile or language is another run"""
+    return f"{job_id}:{profile_name}:{language}"
+
+
+def parse_run_key(key):
+    """(job_id, profile_name, language) of a run_key()"""
+    return tuple(key.split(":", 2))
+
+
+def remove_upload(manager, job_id, upload_path, key=None):
+    """
+    Remove an upload once no queued or running run other than `key` still reads it. Called
+    with the manager's "uploads" lock held, which is also held while an upload is saved and
+    its run submitted, so a run submitted for this file in the meantime is always seen.
+    """
+    others = [other for other in manager.active(job_id + ":") if other != key]
+    if not others and os.path.exists(upload_path):
+        os.remove(upload_path)
+
+
+def run_summarization(inputs, job_id, source, archive, profile_name, regenerate, manager, key, upload_path=None):
+    """Pipeline job, run by the job manager; each attempt resumes from the stages the previous one checkpointed"""
+    try:
+        # Runs of the same input share its job directory and checkpoints, so they run one at a time
+        with manager.group_lock(job_id):
+            if regenerate:
+                reset_stages(JobStore(job_id), "summary", "render")
+            for attempt in range(AppConfig.PIPELINE_ATTEMPTS):
+                try:
+                    summary_path = VideoSummary().run_summarization(inputs, job_id, profile_name)
+                    break
+                except Exception:
+                    if attempt == AppConfig.PIPELINE_ATTEMPTS - 1:
+                        raise
+            archive_job(archive, job_id, source, summary_path, inputs['language'])
+    finally:
+        if upload_path:
+            with manager.group_lock("uploads"):
+                remove_upload(manager, job_id, upload_path, key)
+
+
+def run_chat(chat_memory, summary_content, prompt):
+    """Chat job, run by the chat manager; returns the assistant message to show"""
+    inputs = {
+        'summary': summary_content,
+        'history': chat_memory.render(),
+        'user_message': prompt
+    }
+    started = time.time()
+    chat_crew = VideoSummary().create_chat_crew()
+    response = str(chat_crew.kickoff(inputs=inputs))
+    stats = chat_memory.record(estimate_tokens("".join(inputs.values())), time.time() - started)
+
+    chat_memory.add_turn("user", prompt)
+    chat_memory.add_turn("assistant", response)
+    return {"role": "assistant", "content": response, "stats": stats}
+
+
+def summarize(inputs, source, job_id, profile_name, regenerate, upload_path=None):
+    """
+    Reopen the archived summary of this input if there is one made with the same profile
+    and in the same language, otherwise submit the pipeline job
+    """
+    entry = get_archive().get(job_id, inputs['language'])
+    archived_profile = (entry["metadata"].get("profile") or AppConfig.PIPELINE_PROFILE) if entry else None
+    if not regenerate and archived_profile == profile_name:
+        # A running job of this input (e.g. with another profile) may still be reading the upload
+        if upload_path:
+            remove_upload(get_job_manager(), job_id, upload_path)
+        open_archived(job_id, inputs['language'])
+        return
+    manager = get_job_manager()
+    key = run_key(job_id, profile_name, inputs['language'])
+    manager.submit(
+        key, run_summarization, inputs, job_id, source, get_archive(), profile_name, regenerate,
+        manager, key, upload_path
+    )
+    st.session_state.pending_job = key
+    st.session_state.pop('job_error', None)
+
+
+def save_upload(uploaded_file):
+    """
+    Write an upload to disk under its job ID, so concurrent sessions never share a
+    file name and duplicate uploads of a running job map to the same file.
+    """
+    temp_dir = AppConfig.UPLOAD_DIR
+    os.makedirs(temp_dir, exist_ok=True)
+    extension = os.path.splitext(uploaded_file.name)[1]
+    fd, temp_path = tempfile.mkstemp(dir=temp_dir, suffix=extension)
+    # st.file_uploader already holds the whole upload in memory; getbuffer() writes it
+    # without another copy. Its size is bounded by server.maxUploadSize (.streamlit/config.toml)
+    with os.fdopen(fd, "wb") as f:
+        f.write(uploaded_file.getbuffer())
+    job_id = make_job_id(temp_path)
+    file_path = os.path.join(temp_dir, job_id + extension)
+    os.replace(temp_path, file_path)
+    return file_path, job_id
+
+
+def job_step(store):
+    """The pipeline step a running job is in, from the files its stages have written so far"""
+    for name, step in (("transcript.json", "transcribing"), ("summary.md", "summarizing")):
+        if not os.path.exists(store.file_path(name)):
+            return step
+    return "writing"
+
+
+@st.fragment(run_every=AppConfig.STATUS_POLL_SECONDS)
+def show_job_status(t):
+    """Poll the pending pipeline job and rerun the app once it has finished"""
+    key = st.session_state.get("pending_job")
+    if key is None:
+        return
+    job_id, _, language = parse_run_key(key)
+    manager = get_job_manager()
+    status = manager.status(key)
+    if status is not None and status["state"] in (QUEUED, RUNNING):
+        if status["state"] == QUEUED:
+            step = "queued"
+        elif any(
+            other["state"] == RUNNING and other["started_at"] < status["started_at"]
+            for other_key, other in manager.active(job_id + ":").items() if other_key != key
+        ):
+            # Another run of this input, with another profile or language, goes first
+            step = "waiting"
+        else:
+            step = job_step(JobStore(job_id))
+        elapsed = time.time() - status["submitted_at"]
+        st.info(f"⏳ {t['job_' + step]} ({format_timestamp(elapsed)})")
+        return
+
+    del st.session_state["pending_job"]
+    if status is None or status["state"] == FAILED:
+        st.session_state.job_error = status["error"] if status else t["job_lost"]
+    else:
+        open_archived(job_id, language)
+    st.rerun()
+
+
+@st.fragment(run_every=AppConfig.STATUS_POLL_SECONDS)
+def show_chat_status():
+    """Poll the pending chat reply and rerun the app once it is ready"""
+    chat_id = st.session_state.get("pending_chat")
+    if chat_id is None:
+        return
+    status = get_chat_manager().status(chat_id)
+    if status is not None and status["state"] in (QUEUED, RUNNING):
+        with st.chat_message("assistant"):
+            st.markdown("Thinking...")
+        return
+
+    del st.session_state["pending_chat"]
+    if status is not None and status["state"] == DONE:
+        st.session_state.messages.append(status["result"])
+    else:
+        error = status["error"] if status else "the chat job was lost"
+        st.session_state.messages.append({"role": "assistant", "content": f"Error: {error}"})
+    st.rerun()
+
+
+@st.fragment(run_every=AppConfig.STATUS_POLL_SECONDS)
+def show_range_status():
+    """Poll the pending time-range summary and keep its result for later reruns"""
+    range_id = st.session_state.get("pending_range")
+    if range_id is None:
+        return
+    status = get_chat_manager().status(range_id)
+    if status is not None and status["state"] in (QUEUED, RUNNING):
+        st.markdown("Thinking...")
+        return
+
+    del st.session_state["pending_range"]
+    if status is not None and status["state"] == DONE:
+        st.session_state.range_summary = status["result"]
+    else:
+        st.session_state.range_summary = f"Error: {status['error'] if status else 'the job was lost'}"
+    st.rerun()
+
+
+def format_turn_stats(stats: dict) -> str:
+    return f"~{stats['prompt_tokens']} prompt tokens · {stats['latency_seconds']}s"
 
 
 def set_theme(dark_mode: bool):
@@ -183,6 +385,7 @@ def main():
 
     translations = {
         "English": {
+            "language_code": "en",
             "dark_mode": "Dark Mode",
             "title": "Content Summarizer",
             "youtube_input": "Enter YouTube URL:",
@@ -194,9 +397,26 @@ def main():
             "summary_title": "Generated Summary",
             "chat_title": "Chat About The Summary",
             "chat_input": "Ask a question about the summary...",
-            "summary_info": "Your generated summary and chat will appear here once you provide a URL or file."
+            "summary_info": "Your generated summary and chat will appear here once you provide a URL or file.",
+            "range_title": "Summarize a time range",
+            "range_start": "From (hh:mm:ss)",
+            "range_end": "To (hh:mm:ss)",
+            "range_button": "Summarize Range",
+            "range_invalid": "Enter the range as hh:mm:ss, with the end after the start.",
+            "regenerate": "Regenerate even if already summarized",
+            "profile": "Pipeline profile",
+            "archive_title": "📚 Past Summaries",
+            "archive_search": "Search past summaries",
+            "archive_empty": "No matching summaries.",
+            "job_queued": "Waiting for a free worker...",
+            "job_waiting": "Waiting for another summary of this input to finish...",
+            "job_transcribing": "Transcribing...",
+            "job_summarizing": "Summarizing...",
+            "job_writing": "Writing the summary...",
+            "job_lost": "The job was lost, please submit it again."
         },
         "Français": {
+            "language_code": "fr",
             "dark_mode": "Mode Sombre",
             "title": "Résumeur de Contenu",
             "youtube_input": "Entrez l'URL YouTube :",
@@ -208,7 +428,23 @@ def main():
             "summary_title": "Résumé Généré",
             "chat_title": "Discuter du Résumé",
             "chat_input": "Posez une question sur le résumé...",
-            "summary_info": "Votre résumé généré et le chat apparaîtront ici une fois que vous aurez fourni une URL ou un fichier."
+            "summary_info": "Votre résumé généré et le chat apparaîtront ici une fois que vous aurez fourni une URL ou un fichier.",
+            "range_title": "Résumer une plage horaire",
+            "range_start": "De (hh:mm:ss)",
+            "range_end": "À (hh:mm:ss)",
+            "range_button": "Résumer la plage",
+            "range_invalid": "Saisissez la plage au format hh:mm:ss, avec la fin après le début.",
+            "regenerate": "Régénérer même si déjà résumé",
+            "profile": "Profil de traitement",
+            "archive_title": "📚 Résumés Précédents",
+            "archive_search": "Rechercher dans les résumés",
+            "archive_empty": "Aucun résumé correspondant.",
+            "job_queued": "En attente d'un worker libre...",
+            "job_waiting": "En attente de la fin d'un autre résumé de ce fichier...",
+            "job_transcribing": "Transcription en cours...",
+            "job_summarizing": "Résumé en cours...",
+            "job_writing": "Écriture du résumé...",
+            "job_lost": "La tâche a été perdue, veuillez la soumettre à nouveau."
         }
     }
 
@@ -224,11 +460,18 @@ def main():
 
     st.sidebar.title(t["title"])
 
+    regenerate = st.sidebar.checkbox(t["regenerate"], value=False)
+    profiles = profile_names()
+    profile_name = st.sidebar.selectbox(
+        t["profile"], profiles, index=profiles.index(AppConfig.PIPELINE_PROFILE)
+    )
+    st.sidebar.caption(profile_description(profile_name))
+
     youtube_url = st.sidebar.text_input(t["youtube_input"])
     if st.sidebar.button(t["summarize_url"]):
         if youtube_url:
-            inputs = {'content': youtube_url}
-            show_progress_placebo(inputs, dark_mode)
+            inputs = {'content': youtube_url, 'language': t["language_code"]}
+            summarize(inputs, youtube_url, make_job_id(youtube_url), profile_name, regenerate)
         else:
             st.sidebar.warning(t["warning_url"])
 
@@ -237,52 +480,90 @@ def main():
     uploaded_file = st.sidebar.file_uploader(t["upload_file"], type=["mp3", "wav", "m4a"])
     if st.sidebar.button(t["summarize_file"]):
         if uploaded_file is not None:
-            temp_dir = "temp_audio"
-            os.makedirs(temp_dir, exist_ok=True)
-            file_path = os.path.join(temp_dir, uploaded_file.name)
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            inputs = {'content': file_path}
-            show_progress_placebo(inputs, dark_mode)
-            os.remove(file_path)
+            with get_job_manager().group_lock("uploads"):
+                file_path, job_id = save_upload(uploaded_file)
+                inputs = {'content': file_path, 'language': t["language_code"]}
+                summarize(inputs, uploaded_file.name, job_id, profile_name, regenerate, upload_path=file_path)
         else:
             st.sidebar.warning(t["warning_file"])
 
+    st.sidebar.markdown("---")
+    st.sidebar.subheader(t["archive_title"])
+    archive_query = st.sidebar.text_input(t["archive_search"])
+    if archive_query:
+        archived = get_archive().search(archive_query, limit=AppConfig.ARCHIVE_LIST_SIZE)
+    else:
+        archived = get_archive().recent(limit=AppConfig.ARCHIVE_LIST_SIZE)
+    if not archived:
+        st.sidebar.caption(t["archive_empty"])
+    for entry in archived:
+        label = entry["title"] or entry["source"]
+        if entry["summary_language"]:
+            label += f" ({entry['summary_language']})"
+        if st.sidebar.button(label, key=f"archive_{entry['job_id']}_{entry['summary_language']}"):
+            open_archived(entry["job_id"], entry["summary_language"])
+        if entry.get("snippet"):
+            st.sidebar.caption(entry["snippet"])
+
     st.title("📄 " + t["summary_title"])
-    summary_file_path = "Video_Summary.txt"
-    if os.path.exists(summary_file_path):
-        with open(summary_file_path, "r", encoding="utf-8") as f:
-            summary_content = f.read()
+    if "pending_job" in st.session_state:
+        show_job_status(t)
+    if "job_error" in st.session_state:
+        st.error(st.session_state.job_error)
 
+    summary_content = st.session_state.get("summary_content")
+    if summary_content is not None:
         st.subheader(t["summary_title"])
         st.markdown(summary_content)
+
+        if "job_id" in st.session_state:
+            with st.expander(t["range_title"]):
+                range_start = st.text_input(t["range_start"], value="00:00:00")
+                range_end = st.text_input(t["range_end"], value="00:10:00")
+                if st.button(t["range_button"], disabled="pending_range" in st.session_state):
+                    try:
+                        start, end = parse_timestamp(range_start), parse_timestamp(range_end)
+                    except ValueError:
+                        start = end = None
+                    if start is None or start < 0 or end <= start:
+                        st.warning(t["range_invalid"])
+                    else:
+                        st.session_state.pending_range = get_chat_manager().submit(
+                            f"range:{st.session_state.job_id}:{start}:{end}:{t['language_code']}",
+                            summarize_time_range, st.session_state.job_id, start, end,
+                            language=t["language_code"],
+                        )
+                if "pending_range" in st.session_state:
+                    show_range_status()
+                elif "range_summary" in st.session_state:
+                    st.markdown(st.session_state.range_summary)
+
         st.markdown("---")
         st.subheader(t["chat_title"])
 
         if "messages" not in st.session_state:
             st.session_state.messages = []
+        if "chat_memory" not in st.session_state:
+            st.session_state.chat_memory = ConversationMemory()
+        chat_memory = st.session_state.chat_memory
 
         for message in st.session_state.messages:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
+                if "stats" in message:
+                    st.caption(format_turn_stats(message["stats"]))
 
-        if prompt := st.chat_input(t["chat_input"]):
+        pending_chat = "pending_chat" in st.session_state
+        if prompt := st.chat_input(t["chat_input"], disabled=pending_chat):
             st.session_state.messages.append({"role": "user", "content": prompt})
             with st.chat_message("user"):
                 st.markdown(prompt)
-
-            with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    video_summary_crew = VideoSummary()
-                    inputs = {
-                        'summary': summary_content,
-                        'user_message': prompt
-                    }
-                    chat_crew = video_summary_crew.create_chat_crew()
-                    response = chat_crew.kickoff(inputs=inputs)
-                    st.markdown(response)
-
-            st.session_state.messages.append({"role": "assistant", "content": response})
+            st.session_state.pending_chat = get_chat_manager().submit(
+                uuid.uuid4().hex, run_chat, chat_memory, summary_content, prompt
+            )
+            pending_chat = True
+        if pending_chat:
+            show_chat_status()
     else:
         st.info(t["summary_info"])
 
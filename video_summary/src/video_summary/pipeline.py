@@ -0,0 +1,163 @@
+import copy
+import os
+import threading
+import yaml
+from config.settings import AppConfig
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+PIPELINE_PATH = os.path.join(CONFIG_DIR, "pipeline.yaml")
+
+# Stages the pipeline knows how to run, in order, with the implementations each supports
+STAGE_IMPLEMENTATIONS = {
+    "transcription": ("agent", "python"),
+    "summary": ("agent", "llm"),
+    "render": ("agent", "python"),
+}
+
+# AppConfig settings a profile may override for a single job
+PROFILE_SETTINGS = (
+    "WHISPER_MODEL",
+    "WINDOW_OVERLAP_SECONDS",
+    "AUDIO_QUALITY",
+    "COMPACT_TRANSCRIPTS",
+    "MAX_TRANSCRIPT_TOKENS",
+    "SUMMARY_CHUNK_SECONDS",
+)
+
+# Settings each stage's output depends on; a checkpoint made with other values is not reused
+STAGE_SETTINGS = {
+    "transcription": ("WHISPER_MODEL", "WINDOW_OVERLAP_SECONDS", "AUDIO_QUALITY"),
+    "summary": ("COMPACT_TRANSCRIPTS", "MAX_TRANSCRIPT_TOKENS", "SUMMARY_CHUNK_SECONDS"),
+    "render": (),
+}
+
+# Stages whose output is written in the job's summary language
+LANGUAGE_STAGES = ("summary",)
+
+# Stage options that change how a stage runs but not what it produces
+RUN_OPTIONS = ("cache", "workers")
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def load_pipeline(path: str = None) -> dict:
+    """Read and validate pipeline.yaml; the default file is read once per process"""
+    global _pipeline
+    if path is not None:
+        return _validate(_read(path))
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = _validate(_read(PIPELINE_PATH))
+        return _pipeline
+
+
+def _read(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _validate(pipeline: dict) -> dict:
+    stages = pipeline.get("stages") or {}
+    if list(stages) != list(STAGE_IMPLEMENTATIONS):
+        raise ValueError(f"pipeline.yaml must define the stages {', '.join(STAGE_IMPLEMENTATIONS)} in that order")
+    for name, profile in (pipeline.get("profiles") or {}).items():
+        for stage in profile.get("stages") or {}:
+            if stage not in STAGE_IMPLEMENTATIONS:
+                raise ValueError(f"Profile '{name}' configures unknown stage '{stage}'")
+        # Resolving the profile checks its implementations and settings
+        PipelineProfile.resolve(pipeline, name)
+    return pipeline
+
+
+class PipelineProfile:
+    """A pipeline profile with its stage options, settings and summary language resolved for one job"""
+
+    def __init__(self, name: str, stages: dict, settings: dict, language: str = None):
+        self.name = name
+        self.stages = stages
+        self.settings = settings
+        self.language = language
+
+    @classmethod
+    def resolve(cls, pipeline: dict, name: str, language: str = None) -> "PipelineProfile":
+        profiles = pipeline.get("profiles") or {}
+        if name not in profiles:
+            raise ValueError(f"Unknown pipeline profile '{name}'. Available: {', '.join(profiles)}")
+        profile = profiles[name]
+
+        stages = copy.deepcopy(pipeline["stages"])
+        for stage, options in (profile.get("stages") or {}).items():
+            stages[stage].update(options)
+        for stage, options in stages.items():
+            if options.get("implementation") not in STAGE_IMPLEMENTATIONS[stage]:
+                raise ValueError(
+                    f"Stage '{stage}' of profile '{name}' must be implemented by one of: "
+                    f"{', '.join(STAGE_IMPLEMENTATIONS[stage])}"
+                )
+
+        settings = dict(pipeline.get("settings") or {}, **(profile.get("settings") or {}))
+        unknown = [setting for setting in settings if setting not in PROFILE_SETTINGS]
+        if unknown:
+            raise ValueError(f"Profile '{name}' sets unsupported settings: {', '.join(unknown)}")
+        return cls(name, stages, settings, language)
+
+    def setting(self, name: str):
+        return self.settings.get(name, getattr(AppConfig, name))
+
+    def stage(self, name: str) -> dict:
+        return self.stages[name]
+
+    def implementation(self, stage: str) -> str:
+        return self.stages[stage]["implementation"]
+
+    def signature(self, stage: str) -> dict:
+        """What the output of `stage` depends on, to tell whether a checkpoint can be reused"""
+        signature = {
+            "options": {key: value for key, value in self.stages[stage].items() if key not in RUN_OPTIONS},
+            "settings": {name: self.setting(name) for name in STAGE_SETTINGS[stage]},
+        }
+        if stage in LANGUAGE_STAGES:
+            signature["language"] = self.language
+        return signature
+
+    def to_json(self) -> dict:
+        return {
+            "name": self.name,
+            "stages": self.stages,
+            "settings": {name: self.setting(name) for name in PROFILE_SETTINGS},
+            "language": self.language,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "PipelineProfile":
+        return cls(data["name"], data["stages"], data["settings"], data.get("language"))
+
+
+def profile_names() -> list:
+    return list(load_pipeline().get("profiles") or {})
+
+
+def profile_description(name: str) -> str:
+    return (load_pipeline()["profiles"][name] or {}).get("description", "")
+
+
+def get_profile(name: str = None, language: str = None) -> PipelineProfile:
+    """Resolve a profile by name, PIPELINE_PROFILE by default, for a summary in `language`"""
+    return PipelineProfile.resolve(load_pipeline(), name or AppConfig.PIPELINE_PROFILE, language)
+
+
+def job_profile(store) -> PipelineProfile:
+    """The profile a job is running with, as saved in its store, or the default profile"""
+    data = store.load_json("pipeline.json")
+    return PipelineProfile.from_json(data) if data else get_profile()
+
+
+def task_prompt(task_config: dict, inputs: dict, previous_output: str, label: str) -> str:
+    """A task from tasks.yaml as one LLM prompt, with the previous stage's output appended"""
+    description = task_config["description"]
+    expected_output = task_config["expected_output"]
+    for key, value in inputs.items():
+        description = description.replace("{" + key + "}", str(value))
+        expected_output = expected_output.replace("{" + key + "}", str(value))
+    return f"{description}\n\nExpected output: {expected_output}\n\n{label}:\n{previous_output}"
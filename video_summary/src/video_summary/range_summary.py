@@ -0,0 +1,134 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from crewai import LLM
+from config.settings import AppConfig
+from job_store import JobStore, format_timestamp, format_transcript
+
+CHUNK_PROMPT = (
+    "Summarize the following part of a transcript ({start} to {end}) in a few bullet points. "
+    "Keep names, numbers and timestamps.\n\n{text}"
+)
+
+MERGE_PROMPT = (
+    "The following are summaries of consecutive parts of a transcript, from {start} to {end}. "
+    "Combine them into one coherent summary of that time range, with Key Points as bullet points "
+    "and the timestamps where they are discussed.\n\n{summaries}"
+)
+
+LANGUAGE_PROMPT = "Write it in the language with ISO 639-1 code {language}, whatever the language of the transcript. "
+
+# Chunk summaries are cached per segment source: the stored transcript (time ranges) or the
+# compacted one (long transcripts in the pipeline)
+TRANSCRIPT = "transcript"
+COMPACTED = "compacted"
+
+
+def in_language(prompt: str, language: str = None) -> str:
+    """Prefix a prompt with the summary language, if there is one"""
+    return LANGUAGE_PROMPT.format(language=language) + prompt if language else prompt
+
+
+def chunk_segments(segments: list, chunk_seconds: int) -> dict:
+    """Group segments into fixed-length time chunks, keyed by chunk index"""
+    chunks = {}
+    for segment in segments:
+        chunks.setdefault(int(segment["start"] // chunk_seconds), []).append(segment)
+    return chunks
+
+
+def chunk_prompt(chunks: dict, index: int, chunk_seconds: int, language: str = None) -> str:
+    return in_language(CHUNK_PROMPT.format(
+        start=format_timestamp(index * chunk_seconds),
+        end=format_timestamp((index + 1) * chunk_seconds),
+        text=format_transcript(chunks[index]),
+    ), language)
+
+
+def summarize_chunk(store: JobStore, chunks: dict, index: int, chunk_seconds: int, llm, language: str = None) -> str:
+    """Return the summary of one chunk, from the job store when it has already been produced"""
+    summary = store.get_chunk_summary(TRANSCRIPT, language, chunk_seconds, index)
+    if summary is not None:
+        store.record_reuse("chunk_summary", audio_seconds=chunk_seconds)
+        return summary
+
+    summary = llm.call([{"role": "user", "content": chunk_prompt(chunks, index, chunk_seconds, language)}])
+    store.save_chunk_summary(TRANSCRIPT, language, chunk_seconds, index, summary)
+    return summary
+
+
+def summarize_time_range(job_id: str, start: float, end: float, llm=None, language: str = None) -> str:
+    """
+    Summarize the part of a job's transcript between `start` and `end` seconds, in the
+    summary `language` (an ISO 639-1 code) when one is given.
+
+    The range is widened to whole chunks of SUMMARY_CHUNK_SECONDS. Chunk summaries are
+    cached in the job store per language, so later ranges only pay for chunks not
+    summarized before plus one merge call.
+
+    Returns:
+        str: The summary, or an error message if the job has no transcript
+    """
+    store = JobStore(job_id)
+    segments = store.load_transcript()
+    if not segments:
+        return f"Error: No transcript found for job {job_id}"
+
+    chunk_seconds = AppConfig.SUMMARY_CHUNK_SECONDS
+    chunks = chunk_segments(segments, chunk_seconds)
+    first = int(start // chunk_seconds)
+    last = max(first, math.ceil(end / chunk_seconds) - 1)
+    indices = [i for i in range(first, last + 1) if i in chunks]
+    if not indices:
+        return f"Error: Nothing was said between {format_timestamp(start)} and {format_timestamp(end)}"
+
+    llm = llm or LLM(model=AppConfig.LLM_MODEL)
+    summaries = [summarize_chunk(store, chunks, i, chunk_seconds, llm, language) for i in indices]
+    if len(summaries) == 1:
+        return summaries[0]
+
+    prompt = in_language(MERGE_PROMPT.format(
+        start=format_timestamp(indices[0] * chunk_seconds),
+        end=format_timestamp((indices[-1] + 1) * chunk_seconds),
+        summaries="\n\n".join(summaries),
+    ), language)
+    return llm.call([{"role": "user", "content": prompt}])
+
+
+def summarize_all_chunks(
+    job_id: str, llm=None, chunk_seconds: int = None, workers: int = 1, segments: list = None,
+    source: str = TRANSCRIPT, language: str = None,
+) -> str:
+    """
+    Summarize a whole transcript chunk by chunk, for transcripts too long to hand to the
+    summarizer in one piece. Up to `workers` chunks are summarized at once, and each chunk
+    summary is checkpointed as soon as it and the chunks before it are done.
+    `segments` default to the job's stored transcript; other segments (e.g. the compacted
+    transcript) are cached under their own `source`.
+    """
+    store = JobStore(job_id)
+    chunk_seconds = chunk_seconds or AppConfig.SUMMARY_CHUNK_SECONDS
+    if segments is None:
+        segments, source = store.load_transcript() or [], TRANSCRIPT
+    chunks = chunk_segments(segments, chunk_seconds)
+    llm = llm or LLM(model=AppConfig.LLM_MODEL)
+
+    summaries = {}
+    for index in sorted(chunks):
+        summary = store.get_chunk_summary(source, language, chunk_seconds, index)
+        if summary is not None:
+            store.record_reuse("chunk_summary", audio_seconds=chunk_seconds)
+            summaries[index] = summary
+    missing = [index for index in sorted(chunks) if index not in summaries]
+    # Only the LLM calls run in parallel; the job store is written from this thread
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        prompts = [[{"role": "user", "content": chunk_prompt(chunks, index, chunk_seconds, language)}] for index in missing]
+        for index, summary in zip(missing, executor.map(llm.call, prompts)):
+            store.save_chunk_summary(source, language, chunk_seconds, index, summary)
+            summaries[index] = summary
+
+    sections = []
+    for index, summary in sorted(summaries.items()):
+        sections.append(
+            f"[{format_timestamp(index * chunk_seconds)} - {format_timestamp((index + 1) * chunk_seconds)}]\n{summary}"
+        )
+    return "\n\n".join(sections)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+Archive of every completed summary, with full-text search.
+
+Programmatic use:
+    archive = SummaryArchive()
+    archive.search("ffmpeg install")
+    archive.get(job_id, "en")
+
+From the command line:
+    python summary_archive.py search "ffmpeg install"
+    python summary_archive.py recent
+"""
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config.settings import AppConfig
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    job_id TEXT NOT NULL,
+    summary_language TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL,
+    title TEXT,
+    language TEXT,
+    created_at REAL NOT NULL,
+    summary TEXT NOT NULL,
+    transcript TEXT,
+    metadata TEXT,
+    PRIMARY KEY (job_id, summary_language)
+);
+CREATE INDEX IF NOT EXISTS summaries_created_at ON summaries (created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS summaries_fts USING fts5 (
+    title, summary, transcript, content='summaries', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS summaries_ai AFTER INSERT ON summaries BEGIN
+    INSERT INTO summaries_fts (rowid, title, summary, transcript)
+    VALUES (new.rowid, new.title, new.summary, new.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS summaries_ad AFTER DELETE ON summaries BEGIN
+    INSERT INTO summaries_fts (summaries_fts, rowid, title, summary, transcript)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.transcript);
+END;
+CREATE TRIGGER IF NOT EXISTS summaries_au AFTER UPDATE ON summaries BEGIN
+    INSERT INTO summaries_fts (summaries_fts, rowid, title, summary, transcript)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.transcript);
+    INSERT INTO summaries_fts (rowid, title, summary, transcript)
+    VALUES (new.rowid, new.title, new.summary, new.transcript);
+END;
+"""
+
+# Archives made before summaries were kept per language had one row per job_id
+MIGRATE_PER_LANGUAGE = """
+DROP TRIGGER IF EXISTS summaries_ai;
+DROP TRIGGER IF EXISTS summaries_ad;
+DROP TRIGGER IF EXISTS summaries_au;
+DROP TABLE IF EXISTS summaries_fts;
+ALTER TABLE summaries RENAME TO summaries_by_job;
+"""
+MIGRATE_ROWS = """
+INSERT INTO summaries (job_id, summary_language, source, title, language, created_at, summary, transcript, metadata)
+SELECT job_id, COALESCE(json_extract(metadata, '$.summary_language'), ''), source, title, language,
+       created_at, summary, transcript, metadata
+FROM summaries_by_job;
+DROP TABLE summaries_by_job;
+INSERT INTO summaries_fts (summaries_fts) VALUES ('rebuild');
+"""
+
+# Columns returned by listings; the (large) summary and transcript are only read by get()
+LISTING_COLUMNS = "s.job_id, s.summary_language, s.source, s.title, s.language, s.created_at"
+
+
+def to_fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if not terms:
+        return ""
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SummaryArchive:
+    """
+    SQLite archive of completed jobs, searchable by title, summary and transcript. A job
+    keeps one summary per summary language.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or AppConfig.ARCHIVE_PATH
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(summaries)")]
+            migrate = bool(columns) and "summary_language" not in columns
+            if migrate:
+                conn.executescript(MIGRATE_PER_LANGUAGE)
+            conn.executescript(SCHEMA)
+            if migrate:
+                conn.executescript(MIGRATE_ROWS)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, job_id: str, source: str, summary: str, transcript: str = None, metadata: dict = None) -> None:
+        """Store or replace the archived entry of a job in the summary language of `metadata`"""
+        metadata = metadata or {}
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO summaries (job_id, summary_language, source, title, language, created_at, summary, transcript, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (job_id, summary_language) DO UPDATE SET
+                    source = excluded.source, title = excluded.title, language = excluded.language,
+                    created_at = excluded.created_at, summary = excluded.summary,
+                    transcript = excluded.transcript, metadata = excluded.metadata
+                """,
+                (
+                    job_id, metadata.get("summary_language") or "", source,
+                    metadata.get("title") or os.path.basename(source),
+                    metadata.get("language"), time.time(), summary, transcript,
+                    json.dumps(metadata, ensure_ascii=False),
+                ),
+            )
+
+    def get(self, job_id: str, summary_language: str = None) -> dict:
+        """Return the full archived entry of a job in `summary_language` (the latest one by default), or None"""
+        with self._connect() as conn:
+            if summary_language is None:
+                row = conn.execute(
+                    "SELECT * FROM summaries WHERE job_id = ? ORDER BY created_at DESC LIMIT 1", (job_id,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM summaries WHERE job_id = ? AND summary_language = ?", (job_id, summary_language)
+                ).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["metadata"] = json.loads(entry["metadata"] or "{}")
+        return entry
+
+    def recent(self, limit: int = 20) -> list:
+        """Most recently archived entries, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {LISTING_COLUMNS} FROM summaries s ORDER BY s.created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Best matches for `query` across titles, summaries and transcripts, with a snippet"""
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return self.recent(limit)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {LISTING_COLUMNS}, snippet(summaries_fts, -1, '**', '**', '…', 12) AS snippet
+                FROM summaries_fts
+                JOIN summaries s ON s.rowid = summaries_fts.rowid
+                WHERE summaries_fts MATCH ?
+                ORDER BY bm25(summaries_fts, 10.0, 5.0, 1.0)
+                LIMIT ?
+                """,
+                (fts_query, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main():
+    archive = SummaryArchive()
+    if len(sys.argv) >= 3 and sys.argv[1] == "search":
+        entries = archive.search(" ".join(sys.argv[2:]))
+    elif len(sys.argv) == 2 and sys.argv[1] == "recent":
+        entries = archive.recent()
+    else:
+        print('Usage: summary_archive.py search "<query>" | recent')
+        return
+    for entry in entries:
+        print(json.dumps(entry, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from crewai.tools import BaseTool
+from typing import Type
+from pydantic import BaseModel, Field
+from config.settings import AppConfig
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"\s+", " ", query)
+    return query.strip(" \t\n?!.,;:\"'")
+
+
+def serper_search(query: str) -> str:
+    """Run one query against the Serper API and format the organic results"""
+    request = urllib.request.Request(
+        AppConfig.SERPER_URL,
+        data=json.dumps({"q": query, "num": AppConfig.SEARCH_RESULTS}).encode("utf-8"),
+        headers={"X-API-KEY": os.environ.get("SERPER_API_KEY", ""), "Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        data = json.loads(response.read())
+
+    results = []
+    for item in data.get("organic", [])[:AppConfig.SEARCH_RESULTS]:
+        results.append(
+            f"Title: {item.get('title', '')}\n"
+            f"Link: {item.get('link', '')}\n"
+            f"Snippet: {item.get('snippet', '')}\n---"
+        )
+    return "\n".join(results) or "No results found."
+
+
+class SearchCache:
+    """
+    Cache in front of a search backend.
+
+    Results are stored in SQLite keyed by normalized query and expire after `ttl_seconds`.
+    Concurrent lookups of the same query share a single backend call, and backend calls
+    are capped at `quota_per_minute`; over quota, a stale entry is served if there is one.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: int, quota_per_minute: int, backend=serper_search):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.quota_per_minute = quota_per_minute
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.recent_calls = deque()
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "stale_served": 0,
+            "quota_rejected": 0,
+            "backend_seconds": 0.0,
+        }
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache "
+                "(query_key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self, key: str):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT result, created_at FROM search_cache WHERE query_key = ?", (key,)
+            ).fetchone()
+
+    def _store(self, key: str, result: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (query_key, result, created_at) VALUES (?, ?, ?)",
+                (key, result, time.time()),
+            )
+
+    def _take_quota(self) -> bool:
+        now = time.time()
+        while self.recent_calls and now - self.recent_calls[0] >= 60:
+            self.recent_calls.popleft()
+        if len(self.recent_calls) >= self.quota_per_minute:
+            return False
+        self.recent_calls.append(now)
+        return True
+
+    def search(self, query: str) -> str:
+        key = normalize_query(query)
+        cached = self._load(key)
+
+        with self.lock:
+            self.stats["lookups"] += 1
+            if cached and time.time() - cached[1] < self.ttl_seconds:
+                self.stats["hits"] += 1
+                return cached[0]
+
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                # A call for this query may have finished since the read above; the leader
+                # stores its result before leaving in_flight, so a re-read under the lock sees it
+                cached = self._load(key)
+                if cached and time.time() - cached[1] < self.ttl_seconds:
+                    self.stats["hits"] += 1
+                    return cached[0]
+                if not self._take_quota():
+                    if cached:
+                        self.stats["stale_served"] += 1
+                        return cached[0]
+                    self.stats["quota_rejected"] += 1
+                    return "Error: Search quota exceeded, please try again in a minute."
+                future = Future()
+                self.in_flight[key] = future
+                self.stats["misses"] += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        started = time.time()
+        try:
+            result = self.backend(query)
+            self._store(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.stats["backend_seconds"] += time.time() - started
+                del self.in_flight[key]
+
+    def metrics(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+        served_without_backend = stats["hits"] + stats["coalesced"] + stats["stale_served"]
+        mean_backend = stats["backend_seconds"] / stats["misses"] if stats["misses"] else 0.0
+        stats["hit_rate"] = served_without_backend / stats["lookups"] if stats["lookups"] else 0.0
+        stats["latency_saved_seconds"] = served_without_backend * mean_backend
+        return stats
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """The process-wide search cache shared by every crew"""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(
+                AppConfig.SEARCH_CACHE_PATH,
+                AppConfig.SEARCH_CACHE_TTL_SECONDS,
+                AppConfig.SEARCH_QUOTA_PER_MINUTE,
+            )
+        return _search_cache
+
+
+class CachedSearchToolInput(BaseModel):
+    """Input schema for CachedSearchTool."""
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+class CachedSearchTool(BaseTool):
+    name: str = "Search the internet"
+    description: str = (
+        "A tool that can be used to search the internet with a search_query. "
+        "Returns the title, link and snippet of the top results."
+    )
+    args_schema: Type[BaseModel] = CachedSearchToolInput
+
+    def _run(self, search_query: str) -> str:
+        try:
+            return get_search_cache().search(search_query)
+        except Exception as e:
+            return f"Error during web search: {e}"
@@ -0,0 +1,119 @@
+import re
+from chat_memory import estimate_tokens
+from job_store import format_transcript
+
+# [Music], [Applause], (laughter), ♪ ... ♪ and similar non-speech tags. Only brackets holding
+# nothing but a noise word are tags; other bracketed text ("index [0]", "(music video)") is content
+NOISE_WORDS = r"(?:music|musique|applause|applaudissements|laughter|laughs|rires|inaudible|silence)"
+NOISE_TAGS = re.compile(
+    rf"\[\s*{NOISE_WORDS}\s*\]"
+    rf"|\(\s*{NOISE_WORDS}\s*\)"
+    r"|[♪♫]+",
+    re.IGNORECASE,
+)
+
+# Fillers and hedges that carry no content, in English and French
+FILLERS = re.compile(r"\b(?:u+m+|u+h+m*|e+r+m+|hmm+|euh+|heu+|bah|hein)\b[,.]?", re.IGNORECASE)
+HEDGES = re.compile(r",\s*(?:you know|i mean|tu vois|tu sais|en fait|du coup)\s*,", re.IGNORECASE)
+
+# Stutters on short function words ("the the", "je je je"). Other repeated words are left
+# alone, since many repeat legitimately ("it is is", "nous nous", "no no no", "bora bora")
+STUTTERS = re.compile(
+    r"\b(i|a|an|the|and|but|to|of|we|they|he|she|my|this|je|il|le|les|un|une|et|que)(?:,?\s+\1\b)+",
+    re.IGNORECASE,
+)
+
+SENTENCE_END = re.compile(r"[.!?…]['\"»)]?$")
+
+# Where a transcript came from; only caption transcripts repeat lines on purpose
+CAPTIONS = "captions"
+WHISPER = "whisper"
+
+MIN_OVERLAP_WORDS = 3
+MAX_MERGED_SECONDS = 30
+
+
+def clean_text(text: str) -> str:
+    """Strip noise tags, fillers and stutters from one line of transcript"""
+    text = NOISE_TAGS.sub(" ", text)
+    text = FILLERS.sub(" ", text)
+    text = HEDGES.sub(",", text)
+    text = STUTTERS.sub(r"\1", text)
+    text = re.sub(r"\s+([,.!?])", r"\1", text)
+    text = re.sub(r",(?:\s*,)+", ",", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ,")
+
+
+def strip_rolling_overlap(previous: str, current: str) -> str:
+    """
+    Remove the start of `current` that repeats the end of `previous`, as rolling
+    auto-captions do when each line re-shows the tail of the line before.
+    """
+    previous_words = previous.split()
+    current_words = current.split()
+    longest = min(len(previous_words), len(current_words))
+    for size in range(longest, MIN_OVERLAP_WORDS - 1, -1):
+        if [w.lower() for w in previous_words[-size:]] == [w.lower() for w in current_words[:size]]:
+            return " ".join(current_words[size:])
+    return current
+
+
+def compact_segments(segments: list, source: str = WHISPER) -> list:
+    """
+    Deterministically shrink a transcript before it is summarized: strip noise tags and
+    disfluencies, and merge sentence fragments into segments of at most MAX_MERGED_SECONDS.
+    Repeated and rolling lines are only dropped from CAPTIONS transcripts; in speech
+    recognized by Whisper a repeated phrase was actually said again.
+    """
+    compacted = []
+    previous_text = ""
+    for segment in segments:
+        text = segment["text"].strip()
+        if source == CAPTIONS:
+            # Repeats are detected on the raw caption text, as YouTube shows it
+            if text.lower() == previous_text.lower():
+                text = ""
+            elif previous_text:
+                text = strip_rolling_overlap(previous_text, text)
+            previous_text = segment["text"].strip() or previous_text
+
+        text = clean_text(text)
+        if not text:
+            if compacted:
+                compacted[-1]["end"] = max(compacted[-1]["end"], segment["end"])
+            continue
+
+        last = compacted[-1] if compacted else None
+        if (
+            last is not None
+            and not SENTENCE_END.search(last["text"])
+            and segment["end"] - last["start"] <= MAX_MERGED_SECONDS
+        ):
+            # Clean again so fillers and stutters split across caption lines are caught
+            last["text"] = clean_text(f"{last['text']} {text}")
+            last["end"] = segment["end"]
+            if segment.get("avg_logprob") is not None and last.get("avg_logprob") is not None:
+                last["avg_logprob"] = min(last["avg_logprob"], segment["avg_logprob"])
+            continue
+
+        compacted.append({
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": text,
+            "avg_logprob": segment.get("avg_logprob"),
+        })
+    return compacted
+
+
+def compaction_report(raw_segments: list, compacted_segments: list) -> dict:
+    """Token counts of the transcript as the summarizer sees it, before and after compaction"""
+    raw_tokens = estimate_tokens(format_transcript(raw_segments))
+    compacted_tokens = estimate_tokens(format_transcript(compacted_segments))
+    return {
+        "raw_segments": len(raw_segments),
+        "compacted_segments": len(compacted_segments),
+        "raw_tokens": raw_tokens,
+        "compacted_tokens": compacted_tokens,
+        "token_reduction": round(1 - compacted_tokens / raw_tokens, 3) if raw_tokens else 0.0,
+    }
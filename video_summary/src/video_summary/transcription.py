@@ -0,0 +1,312 @@
+import json
+import os
+import subprocess
+import urllib.request
+import urllib.error
+import numpy as np
+import whisper
+from whisper.audio import SAMPLE_RATE, N_FFT, N_FRAMES, CHUNK_LENGTH
+from config.settings import AppConfig
+from cpu_slots import get_cpu_slots
+
+FRAMES_PER_SECOND = N_FRAMES // CHUNK_LENGTH
+FREQ_BINS = N_FFT // 2 + 1
+
+# Bytes held per second of a decoded window: the raw s16le PCM from ffmpeg and its float32 copy
+DECODE_BYTES_PER_SECOND = SAMPLE_RATE * 2 + SAMPLE_RATE * 4
+
+# Bytes whisper.log_mel_spectrogram allocates per second of the audio it is given: the padded
+# float32 copy, the complex64 STFT, the magnitudes and their square, and the mel frames and their log
+MEL_BYTES_PER_SECOND = (
+    SAMPLE_RATE * 4
+    + FREQ_BINS * FRAMES_PER_SECOND * 8
+    + FREQ_BINS * FRAMES_PER_SECOND * 4 * 2
+    + 80 * FRAMES_PER_SECOND * 4 * 2
+)
+
+
+def get_device():
+    """Return the device to load Whisper on, or None to let Whisper pick the best one"""
+    if AppConfig.FORCE_CPU or not AppConfig.ENABLE_GPU:
+        return "cpu"
+    return None
+
+
+def load_whisper_model(device=None, model_name: str = None):
+    """Load `model_name`, or the configured Whisper model"""
+    return whisper.load_model(model_name or AppConfig.WHISPER_MODEL, device=device)
+
+
+def get_audio_duration(file_path: str) -> float:
+    """
+    Read the duration of an audio file with ffprobe, without decoding it.
+
+    Args:
+        file_path (str): Path to the audio file
+
+    Returns:
+        float: Duration in seconds
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        file_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+def decode_audio_window(file_path: str, start: float, duration: float) -> np.ndarray:
+    """
+    Decode a single window of an audio file to 16 kHz mono float32, like whisper.load_audio
+    but seeking to `start` and stopping after `duration` seconds.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-ss", f"{start:.3f}", "-t", f"{duration:.3f}",
+        "-i", file_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode()}") from e
+
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def window_memory_bytes(window_seconds: float) -> int:
+    """
+    Peak audio buffer memory for transcribing one window. Whisper pads the audio with
+    CHUNK_LENGTH seconds of silence before computing the log-mel spectrogram.
+    """
+    return int(window_seconds * DECODE_BYTES_PER_SECOND + (window_seconds + CHUNK_LENGTH) * MEL_BYTES_PER_SECOND)
+
+
+def plan_window_seconds(memory_budget_mb: int = None, overlap_seconds: int = None) -> int:
+    """
+    Work out how many seconds of audio a window may hold within the job's memory budget.
+
+    Raises:
+        MemoryError: If the budget cannot hold even one 30-second Whisper window plus overlap
+    """
+    if memory_budget_mb is None:
+        memory_budget_mb = AppConfig.JOB_MEMORY_BUDGET_MB
+    if overlap_seconds is None:
+        overlap_seconds = AppConfig.WINDOW_OVERLAP_SECONDS
+
+    budget = memory_budget_mb * 1024 * 1024
+    affordable = int((budget - CHUNK_LENGTH * MEL_BYTES_PER_SECOND) // (DECODE_BYTES_PER_SECOND + MEL_BYTES_PER_SECOND))
+    minimum = CHUNK_LENGTH + overlap_seconds
+    if affordable < minimum:
+        raise MemoryError(
+            f"Memory budget of {memory_budget_mb} MB is too small: "
+            f"at least {minimum} seconds of audio must fit in one window."
+        )
+    return min(AppConfig.WINDOW_SECONDS, affordable)
+
+
+def convert_to_wav(file_path: str, wav_path: str) -> None:
+    """Decode an audio file once to 16 kHz mono PCM, which later windows can seek in cheaply"""
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-threads", "0",
+        "-i", file_path,
+        "-ac", "1", "-ar", str(SAMPLE_RATE), "-acodec", "pcm_s16le",
+        wav_path,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode()}") from e
+
+
+def transcribe_windowed(model, file_path: str, window_seconds: int, overlap_seconds: int, duration: float = None, checkpoint=None, **decode_options) -> dict:
+    """
+    Transcribe an audio file window by window so only one window is ever held in memory.
+
+    Consecutive windows overlap by `overlap_seconds`. Each window keeps the segments that
+    start before the middle of its trailing overlap; the next window picks up from there.
+
+    Args:
+        model: A loaded Whisper model
+        file_path (str): Path to the audio file
+        window_seconds (int): Length of each decoded window
+        overlap_seconds (int): Overlap between consecutive windows
+        duration (float): Length of the audio if already known, otherwise read with ffprobe
+        checkpoint (JobStore): If given, each finished window is saved there and windows
+            saved by an earlier, interrupted run are reused instead of transcribed again
+        **decode_options: Extra options passed to model.transcribe
+
+    Returns:
+        dict: {"text": ..., "segments": [...]} with segment times relative to the whole file
+    """
+    if overlap_seconds >= window_seconds:
+        raise ValueError("Window overlap must be shorter than the window itself.")
+
+    if duration is None:
+        duration = get_audio_duration(file_path)
+    step = window_seconds - overlap_seconds
+    segments = []
+    previous_cut = 0.0
+    start = 0.0
+    index = 0
+
+    # Saved windows are only valid for the same windowing and decoding options
+    params = [window_seconds, overlap_seconds, decode_options.get("language")]
+    state = checkpoint.load_json("transcription_windows.json") if checkpoint else None
+    if not state or state["params"] != params:
+        state = {"params": params, "windows": {}}
+
+    while start < duration:
+        is_last = start + window_seconds >= duration
+        cut = float("inf") if is_last else start + window_seconds - overlap_seconds / 2
+
+        saved = state["windows"].get(str(index))
+        if saved is not None:
+            segments.extend(saved)
+            checkpoint.record_reuse("transcription", audio_seconds=min(step, duration - start))
+        else:
+            audio = decode_audio_window(file_path, start, window_seconds)
+            if audio.size == 0:
+                break
+
+            prompt = segments[-1]["text"] if segments else None
+            result = model.transcribe(audio, initial_prompt=prompt, **decode_options)
+            del audio
+
+            kept = []
+            for segment in result["segments"]:
+                segment_start = segment["start"] + start
+                if segment_start < previous_cut or segment_start >= cut:
+                    continue
+                kept.append({
+                    "start": segment_start,
+                    "end": segment["end"] + start,
+                    "text": segment["text"],
+                    "avg_logprob": segment.get("avg_logprob"),
+                })
+            segments.extend(kept)
+
+            if checkpoint:
+                state["windows"][str(index)] = kept
+                checkpoint.save_json("transcription_windows.json", state)
+
+        if is_last:
+            break
+        previous_cut = cut
+        start += step
+        index += 1
+
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+    }
+
+
+def language_probe_offset(duration: float) -> float:
+    """Start of the language probe window: past the intro, unless the audio is too short"""
+    offset = AppConfig.LANGUAGE_PROBE_OFFSET_SECONDS
+    if duration is None or duration < offset + CHUNK_LENGTH:
+        return 0
+    return offset
+
+
+def detect_language(model, file_path: str, duration: float) -> str:
+    """
+    Detect the spoken language from a single 30-second probe window instead of letting
+    every transcription window run its own detection.
+    """
+    if not model.is_multilingual:
+        return "en"
+
+    audio = decode_audio_window(file_path, language_probe_offset(duration), CHUNK_LENGTH)
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels).to(model.device)
+    _, probs = model.detect_language(mel)
+    return max(probs, key=probs.get)
+
+
+def transcribe_remote(file_path: str, language: str = None, model_name: str = None) -> dict:
+    """
+    Send an audio file to the shared transcription service and wait for the result.
+
+    Returns:
+        dict: Whisper-style result with "text" and "segments"
+    """
+    payload = json.dumps({
+        "file_path": os.path.abspath(file_path),
+        "language": language,
+        "model": model_name or AppConfig.WHISPER_MODEL,
+    }).encode("utf-8")
+    request = urllib.request.Request(
+        AppConfig.TRANSCRIPTION_SERVICE_URL.rstrip("/") + "/transcribe",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=AppConfig.TRANSCRIPTION_SERVICE_TIMEOUT) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"Transcription service error: {json.loads(e.read()).get('error')}") from e
+
+
+def transcribe_file(file_path: str, device=None, duration: float = None, language: str = None, store=None, model_name: str = None, overlap_seconds: int = None) -> dict:
+    """
+    Transcribe an audio file with the configured Whisper model, in windowed mode when enabled,
+    or through the shared transcription service when TRANSCRIPTION_SERVICE_URL is set.
+    Unless `language` is given, the spoken language is detected once on a probe window and
+    passed explicitly to every window.
+
+    With a job `store`, the decoded audio and every finished window are checkpointed in the
+    job directory, so a retry resumes from the last completed window.
+
+    `model_name` and `overlap_seconds` override WHISPER_MODEL and WINDOW_OVERLAP_SECONDS
+    for this call. Local transcriptions run inside a CPU slot, which bounds how many run at once and how
+    many threads and cores each one gets.
+
+    Returns:
+        dict: Whisper-style result with "text", "segments" and "language"
+    """
+    if AppConfig.TRANSCRIPTION_SERVICE_URL:
+        return transcribe_remote(file_path, language, model_name)
+
+    with get_cpu_slots().acquire():
+        return _transcribe_local(file_path, device, duration, language, store, model_name, overlap_seconds)
+
+
+def _transcribe_local(file_path: str, device, duration: float, language: str, store, model_name: str, overlap_seconds: int) -> dict:
+    whisper_model = load_whisper_model(device=device, model_name=model_name)
+    if not AppConfig.WINDOWED_TRANSCRIPTION:
+        if language is None:
+            if duration is None:
+                duration = get_audio_duration(file_path)
+            language = detect_language(whisper_model, file_path, duration)
+        return whisper_model.transcribe(file_path, language=language)
+
+    if store is not None:
+        wav_path = store.file_path("audio_16k.wav")
+        if store.stage_done("decode") and os.path.exists(wav_path):
+            store.record_reuse("decode")
+        else:
+            convert_to_wav(file_path, wav_path)
+            store.mark_stage("decode")
+        file_path = wav_path
+
+    if duration is None:
+        duration = get_audio_duration(file_path)
+    if language is None and store is not None:
+        saved = store.load_json("transcription_windows.json")
+        language = saved["params"][2] if saved else None
+    if language is None:
+        language = detect_language(whisper_model, file_path, duration)
+
+    if overlap_seconds is None:
+        overlap_seconds = AppConfig.WINDOW_OVERLAP_SECONDS
+    window_seconds = plan_window_seconds(overlap_seconds=overlap_seconds)
+    result = transcribe_windowed(
+        whisper_model, file_path, window_seconds, overlap_seconds,
+        duration=duration, checkpoint=store, language=language,
+    )
+    result["language"] = language
+    return result
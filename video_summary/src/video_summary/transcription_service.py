@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+"""
+Shared transcription service.
+
+A long-lived local process that owns the loaded Whisper models and batches 30-second
+mel windows from all concurrent requests into a single forward pass.
+
+Run it with:
+    python video_summary/src/video_summary/transcription_service.py
+
+and point the app at it with TRANSCRIPTION_SERVICE_URL=http://127.0.0.1:8765 in .env.
+
+Endpoints:
+    POST /transcribe  {"file_path": "...", "language": "en" (optional), "model": "small" (optional)}
+    GET  /metrics     batching and utilization counters
+    GET  /health
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import torch
+import whisper
+from whisper.audio import SAMPLE_RATE, N_SAMPLES, CHUNK_LENGTH
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config.settings import AppConfig
+from transcription import (
+    get_device, get_audio_duration, decode_audio_window, plan_window_seconds, language_probe_offset,
+)
+
+# Same thresholds Whisper uses to drop silent windows
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+# Queued in place of a language to ask the batcher thread for language detection
+DETECT = "detect"
+
+
+class WindowBatcher:
+    """
+    Collects mel windows from concurrent requests and decodes them in batches.
+    Every forward pass through the model, language detection included, runs on the batcher
+    thread, since Whisper's kv-cache hooks do not support concurrent passes on one model.
+    """
+
+    def __init__(self, model, max_batch_size: int, max_wait_ms: int):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.stats = {
+            "windows": 0,
+            "batches": 0,
+            "detections": 0,
+            "busy_seconds": 0.0,
+            "batch_sizes": {},
+        }
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, mel: torch.Tensor, language: str = None) -> Future:
+        """Queue one (n_mels, 3000) mel window; the future resolves to a DecodingResult"""
+        future = Future()
+        self.queue.put((mel, language, future))
+        return future
+
+    def detect_language(self, mel: torch.Tensor) -> Future:
+        """Queue one mel window for language detection; the future resolves to a language code"""
+        future = Future()
+        self.queue.put((mel, DETECT, future))
+        return future
+
+    def _collect(self) -> list:
+        items = [self.queue.get()]
+        deadline = time.time() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            # Windows can only share a forward pass when they share decoding options
+            groups = {}
+            for item in items:
+                groups.setdefault(item[1], []).append(item)
+
+            for language, group in groups.items():
+                started = time.time()
+                try:
+                    mel_batch = torch.stack([mel for mel, _, _ in group])
+                    if language == DETECT:
+                        results = self._detect_languages(mel_batch)
+                    else:
+                        options = whisper.DecodingOptions(
+                            language=language,
+                            without_timestamps=True,
+                            fp16=self.model.device.type == "cuda",
+                        )
+                        results = whisper.decode(self.model, mel_batch, options)
+                    for (_, _, future), result in zip(group, results):
+                        future.set_result(result)
+                except Exception as e:
+                    for _, _, future in group:
+                        future.set_exception(e)
+
+                with self.lock:
+                    size = len(group)
+                    self.stats["busy_seconds"] += time.time() - started
+                    if language == DETECT:
+                        self.stats["detections"] += size
+                        continue
+                    self.stats["windows"] += size
+                    self.stats["batches"] += 1
+                    self.stats["batch_sizes"][size] = self.stats["batch_sizes"].get(size, 0) + 1
+
+    def _detect_languages(self, mel_batch: torch.Tensor) -> list:
+        if not self.model.is_multilingual:
+            return ["en"] * len(mel_batch)
+        with torch.no_grad():
+            _, probs = self.model.detect_language(mel_batch)
+        return [max(window_probs, key=window_probs.get) for window_probs in probs]
+
+    def metrics(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats, batch_sizes=dict(self.stats["batch_sizes"]))
+        uptime = time.time() - self.started_at
+        stats["uptime_seconds"] = uptime
+        stats["utilization"] = stats["busy_seconds"] / uptime if uptime else 0.0
+        stats["mean_batch_size"] = stats["windows"] / stats["batches"] if stats["batches"] else 0.0
+        stats["queue_depth"] = self.queue.qsize()
+        return stats
+
+
+class TranscriptionService:
+    """Owns the loaded models and turns audio files into Whisper-style results"""
+
+    def __init__(self):
+        self.device = get_device()
+        self.batchers = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.active_requests = 0
+
+    def batcher(self, model_name: str) -> WindowBatcher:
+        with self.lock:
+            if model_name not in self.batchers:
+                model = whisper.load_model(model_name, device=self.device)
+                self.batchers[model_name] = WindowBatcher(
+                    model, AppConfig.SERVICE_MAX_BATCH_SIZE, AppConfig.SERVICE_MAX_WAIT_MS
+                )
+            return self.batchers[model_name]
+
+    def transcribe(self, file_path: str, language: str = None, model_name: str = None) -> dict:
+        """
+        Transcribe a local audio file by splitting it into 30-second windows and sending
+        them through the shared batcher. Audio is decoded one memory-budgeted span at a time.
+        Without a `language`, it is detected once on the batcher thread from the same probe
+        window the in-process path uses, and used for all of them.
+        """
+        batcher = self.batcher(model_name or AppConfig.WHISPER_MODEL)
+        model = batcher.model
+        with self.lock:
+            self.requests += 1
+            self.active_requests += 1
+
+        try:
+            duration = get_audio_duration(file_path)
+            if language is None:
+                language = self.detect_language(batcher, file_path, duration)
+            span_seconds = plan_window_seconds(overlap_seconds=0) // CHUNK_LENGTH * CHUNK_LENGTH
+            segments = []
+
+            span_start = 0.0
+            while span_start < duration:
+                audio = decode_audio_window(file_path, span_start, span_seconds)
+                if audio.size == 0:
+                    break
+
+                futures = []
+                for offset in range(0, audio.size, N_SAMPLES):
+                    window = audio[offset:offset + N_SAMPLES]
+                    mel = whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(window), model.dims.n_mels
+                    ).to(model.device)
+                    start = span_start + offset / SAMPLE_RATE
+                    futures.append((start, start + window.size / SAMPLE_RATE, batcher.submit(mel, language)))
+                del audio
+
+                for start, end, future in futures:
+                    result = future.result()
+                    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                        continue
+                    segments.append({
+                        "start": start,
+                        "end": end,
+                        "text": result.text,
+                        "avg_logprob": result.avg_logprob,
+                    })
+                span_start += span_seconds
+        finally:
+            with self.lock:
+                self.active_requests -= 1
+
+        return {
+            "text": " ".join(segment["text"].strip() for segment in segments),
+            "segments": segments,
+            "language": language,
+        }
+
+    def detect_language(self, batcher: WindowBatcher, file_path: str, duration: float) -> str:
+        """Detect the spoken language on one probe window, past the intro like transcription.detect_language"""
+        model = batcher.model
+        if not model.is_multilingual:
+            return "en"
+        audio = decode_audio_window(file_path, language_probe_offset(duration), CHUNK_LENGTH)
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels).to(model.device)
+        return batcher.detect_language(mel).result()
+
+    def metrics(self) -> dict:
+        with self.lock:
+            metrics = {
+                "requests": self.requests,
+                "active_requests": self.active_requests,
+                "models": {},
+            }
+            batchers = dict(self.batchers)
+        for model_name, batcher in batchers.items():
+            metrics["models"][model_name] = batcher.metrics()
+        return metrics
+
+
+def make_handler(service: TranscriptionService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                self._send_json(200, service.metrics())
+            else:
+                self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/transcribe":
+                self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length))
+                file_path = request["file_path"]
+                if not os.path.exists(file_path):
+                    self._send_json(400, {"error": f"File not found at {file_path}"})
+                    return
+                result = service.transcribe(file_path, request.get("language"), request.get("model"))
+                self._send_json(200, result)
+            except (KeyError, ValueError) as e:
+                self._send_json(400, {"error": f"Invalid request: {e}"})
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    service = TranscriptionService()
+    # Load the default model up front so the first request does not pay for it
+    service.batcher(AppConfig.WHISPER_MODEL)
+    server = ThreadingHTTPServer(
+        (AppConfig.SERVICE_HOST, AppConfig.SERVICE_PORT), make_handler(service)
+    )
+    print(f"Transcription service listening on http://{AppConfig.SERVICE_HOST}:{AppConfig.SERVICE_PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
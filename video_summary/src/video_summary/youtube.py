@@ -0,0 +1,218 @@
+import glob
+import os
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import yt_dlp
+from youtube_transcript_api import (
+    YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable,
+    NotTranslatable, TranslationLanguageNotAvailable,
+)
+from config.settings import AppConfig
+from job_store import format_timestamp
+
+
+class DownloadCancelled(Exception):
+    """Raised from yt-dlp hooks to abort a download that is no longer needed"""
+
+
+def is_youtube_url(text: str) -> bool:
+    """Check if the input is a YouTube URL"""
+    return 'youtube.com' in text or 'youtu.be' in text
+
+
+def extract_video_id(url):
+    parsed_url = urllib.parse.urlparse(url)
+    hostname = parsed_url.hostname.lower() if parsed_url.hostname else ''
+    if 'youtu.be' in hostname:
+        return parsed_url.path[1:]
+    elif 'youtube.com' in hostname:
+        if parsed_url.path == '/watch':
+            query = urllib.parse.parse_qs(parsed_url.query)
+            return query.get('v', [None])[0]
+        elif parsed_url.path.startswith(('/embed/', '/v/')):
+            return parsed_url.path.split('/')[2]
+    return None
+
+
+def choose_caption_track(transcript_list, languages: list):
+    """
+    Pick the best caption track from the list fetched once for the video: a manual track
+    in a preferred language, then a generated one, then the original track translated
+    into the first preferred language when YouTube can translate it, then the original.
+    """
+    for find in (transcript_list.find_manually_created_transcript, transcript_list.find_generated_transcript):
+        try:
+            return find(languages)
+        except NoTranscriptFound:
+            pass
+
+    tracks = list(transcript_list)
+    if not tracks:
+        return None
+    original = tracks[0]
+    if AppConfig.TRANSLATE_CAPTIONS and original.is_translatable:
+        try:
+            return original.translate(languages[0])
+        except (NotTranslatable, TranslationLanguageNotAvailable):
+            pass
+    return original
+
+
+def get_youtube_transcription(url: str, language: str = None) -> tuple:
+    """
+    Fetch the video's captions as segments, preferring `language` and then CAPTION_LANGUAGES.
+
+    Returns:
+        tuple: (segments, language code of the chosen track), or (None, None) if there are no captions
+    """
+    video_id = extract_video_id(url)
+    if not video_id:
+        return None, None
+
+    languages = [language] if language else []
+    languages += [code for code in AppConfig.CAPTION_LANGUAGES if code not in languages]
+
+    try:
+        transcript_list = YouTubeTranscriptApi().list(video_id)
+        track = choose_caption_track(transcript_list, languages)
+        if track is None:
+            return None, None
+        transcript_data = track.fetch()
+        # print(f"Received transcript: {transcript_data}")
+        segments = [
+            {
+                'start': snippet.start,
+                'end': snippet.start + snippet.duration,
+                'text': snippet.text,
+                'avg_logprob': None,
+            }
+            for snippet in transcript_data.snippets
+        ]
+        return segments, track.language_code
+    except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable):
+        return None, None
+
+
+def get_youtube_metadata(url: str) -> dict:
+    """Extract title, channel, duration and chapters without downloading anything"""
+    with yt_dlp.YoutubeDL({'quiet': True, 'skip_download': True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return {
+        'title': info.get('title'),
+        'channel': info.get('channel') or info.get('uploader'),
+        'duration': info.get('duration'),
+        'chapters': [
+            {'start': chapter.get('start_time'), 'title': chapter.get('title')}
+            for chapter in info.get('chapters') or []
+        ],
+    }
+
+
+def download_youtube_audio(url: str, out_dir: str, cancel_event: threading.Event, quality: str = None) -> str:
+    """
+    Download the audio track as mp3 of `quality` kbps (AUDIO_QUALITY by default) into `out_dir`.
+
+    The download aborts, and its partial files are removed, as soon as `cancel_event` is set.
+
+    Returns:
+        str: Path to the mp3 file, or None if the download was cancelled
+    """
+    def check_cancelled(_):
+        if cancel_event.is_set():
+            raise DownloadCancelled()
+
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': str(quality or AppConfig.AUDIO_QUALITY),
+        }],
+        'outtmpl': os.path.join(out_dir, 'audio_file.%(ext)s'),
+        'quiet': True,
+        'progress_hooks': [check_cancelled],
+        'postprocessor_hooks': [check_cancelled],
+    }
+
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
+    except (DownloadCancelled, yt_dlp.utils.DownloadError):
+        # yt-dlp may wrap the exception raised from a hook in a DownloadError
+        if not cancel_event.is_set():
+            raise
+        for partial in glob.glob(os.path.join(out_dir, 'audio_file.*')):
+            os.remove(partial)
+        return None
+
+    return os.path.join(out_dir, 'audio_file.mp3')
+
+
+def prefetch_youtube(url: str, out_dir: str, language: str = None, audio_quality: str = None) -> dict:
+    """
+    Start the caption fetch, metadata extraction and audio download at the same time.
+    Captions are picked for `language` when the video has or can translate to it.
+
+    If usable captions arrive, the audio download is cancelled and this returns without
+    waiting for it; otherwise it waits for the audio so Whisper can take over.
+
+    Returns:
+        dict: {"segments": captions or None, "caption_language": code or None,
+               "metadata": dict, "audio_file": path or None}
+    """
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=3)
+    captions_future = executor.submit(get_youtube_transcription, url, language)
+    metadata_future = executor.submit(get_youtube_metadata, url)
+    audio_future = executor.submit(download_youtube_audio, url, out_dir, cancel_event, audio_quality)
+
+    try:
+        try:
+            segments, caption_language = captions_future.result()
+        except Exception:
+            segments, caption_language = None, None
+        audio_file = None
+        if segments:
+            cancel_event.set()
+        else:
+            audio_file = audio_future.result()
+
+        try:
+            metadata = metadata_future.result()
+        except Exception:
+            # Metadata only improves planning and the summary header, it is never required
+            metadata = {}
+    finally:
+        # Do not wait for a cancelled download to wind down
+        executor.shutdown(wait=False)
+
+    return {
+        "segments": segments,
+        "caption_language": caption_language,
+        "metadata": metadata,
+        "audio_file": audio_file,
+    }
+
+
+def format_metadata_header(metadata: dict) -> str:
+    """Render video metadata as a short header to put in front of the transcript"""
+    if not metadata:
+        return ""
+
+    lines = []
+    if metadata.get('title'):
+        lines.append(f"Title: {metadata['title']}")
+    if metadata.get('channel'):
+        lines.append(f"Channel: {metadata['channel']}")
+    if metadata.get('duration'):
+        lines.append(f"Duration: {format_timestamp(metadata['duration'])}")
+    if metadata.get('language'):
+        lines.append(f"Transcript language: {metadata['language']}")
+    if metadata.get('chapters'):
+        lines.append("Chapters:")
+        lines.extend(
+            f"- [{format_timestamp(chapter['start'] or 0)}] {chapter['title']}"
+            for chapter in metadata['chapters']
+        )
+    return "\n".join(lines) + "\n\n" if lines else ""
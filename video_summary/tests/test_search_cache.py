@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary"))
+import tools.search_cache_tool as search_cache_tool
+from config.settings import AppConfig
+from tools.search_cache_tool import SearchCache
+
+
+class FakeSerper:
+    """Local stand-in for the Serper API that records the queries it receives"""
+
+    def __init__(self):
+        self.queries = []
+        self.release = threading.Event()
+        self.release.set()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["q"]
+                fake.queries.append(query)
+                fake.release.wait(timeout=10)
+                body = json.dumps({"organic": [
+                    {"title": f"About {query}", "link": "https://example.com", "snippet": f"{query} explained"},
+                ]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/search"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def serper(monkeypatch):
+    fake = FakeSerper()
+    monkeypatch.setattr(AppConfig, "SERPER_URL", fake.url)
+    yield fake
+    fake.release.set()
+    fake.server.shutdown()
+    fake.server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(search_cache_tool, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, ttl_seconds=60, quota_per_minute=10):
+    return SearchCache(str(tmp_path / "search_cache.db"), ttl_seconds, quota_per_minute)
+
+
+def test_concurrent_queries_share_one_call(tmp_path, serper):
+    cache = make_cache(tmp_path)
+    serper.release.clear()
+    results = []
+    threads = [
+        threading.Thread(target=lambda query=query: results.append(cache.search(query)))
+        for query in ["Whisper model", "whisper model", "  Whisper   Model?"] * 3
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in range(100):
+        if cache.metrics()["coalesced"] == len(threads) - 1:
+            break
+        threading.Event().wait(0.05)
+    serper.release.set()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(serper.queries) == 1
+    assert len(results) == len(threads) and len(set(results)) == 1
+    assert f"Title: About {serper.queries[0]}" in results[0]
+    metrics = cache.metrics()
+    assert (metrics["misses"], metrics["coalesced"]) == (1, len(threads) - 1)
+
+
+def test_entries_expire_after_ttl(tmp_path, serper, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.search("whisper")
+    clock.now += 59
+    cache.search("whisper")
+    assert len(serper.queries) == 1
+
+    clock.now += 2
+    cache.search("whisper")
+    assert len(serper.queries) == 2
+    assert cache.metrics()["hits"] == 1
+
+
+def test_queries_over_quota_are_rejected(tmp_path, serper, clock):
+    cache = make_cache(tmp_path, quota_per_minute=2)
+    cache.search("first")
+    cache.search("second")
+    assert cache.search("third") == "Error: Search quota exceeded, please try again in a minute."
+    assert serper.queries == ["first", "second"]
+    assert cache.metrics()["quota_rejected"] == 1
+
+    clock.now += 60
+    assert "Title: About third" in cache.search("third")
+
+
+def test_stale_entry_is_served_over_quota(tmp_path, serper, clock):
+    cache = make_cache(tmp_path, ttl_seconds=10, quota_per_minute=1)
+    first = cache.search("whisper")
+    clock.now += 30
+    assert cache.search("whisper") == first
+    assert len(serper.queries) == 1
+    assert cache.metrics()["stale_served"] == 1
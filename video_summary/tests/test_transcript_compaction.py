@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary"))
+from transcript_compaction import CAPTIONS, WHISPER, clean_text, compact_segments
+
+
+@pytest.mark.parametrize("text", [
+    "a 35 mm lens",
+    "Array index [0]",
+    "said no no no",
+    "Bye bye",
+    "that that was it",
+    "nous nous sommes vus",
+    "the (silence of the lambs) film",
+    "Cafe (music video) review",
+    "what it is is a tool",
+    "bora bora",
+    "I'll tell you you can",
+])
+def test_content_is_kept(text):
+    assert clean_text(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("[Music] so the the plan", "so the plan"),
+    ("[ Applause ] thank you", "thank you"),
+    ("um, we we start (laughs) now", "we start now"),
+    ("euh je je pense", "je pense"),
+    ("♪ ♪", ""),
+])
+def test_noise_is_removed(text, expected):
+    assert clean_text(text) == expected
+
+
+def test_rolling_captions_are_merged():
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": "so today we are going"},
+        {"start": 2.0, "end": 4.0, "text": "we are going to look at"},
+        {"start": 4.0, "end": 6.0, "text": "to look at whisper."},
+    ]
+    compacted = compact_segments(segments, CAPTIONS)
+    assert [segment["text"] for segment in compacted] == ["so today we are going to look at whisper."]
+    assert (compacted[0]["start"], compacted[0]["end"]) == (0.0, 6.0)
+
+
+def test_repeated_speech_is_kept():
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": "Thank you."},
+        {"start": 2.0, "end": 4.0, "text": "Thank you."},
+        {"start": 4.0, "end": 6.0, "text": "and the point is this"},
+        {"start": 6.0, "end": 9.0, "text": "the point is this matters a lot."},
+    ]
+    compacted = compact_segments(segments, WHISPER)
+    assert [segment["text"] for segment in compacted] == [
+        "Thank you.",
+        "Thank you.",
+        "and the point is this the point is this matters a lot.",
+    ]
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "video_summary"))
+torch = pytest.importorskip("torch")
+whisper = pytest.importorskip("whisper")
+from whisper.audio import SAMPLE_RATE, N_FFT, HOP_LENGTH, N_SAMPLES, mel_filters
+from config.settings import AppConfig
+from transcription import plan_window_seconds, window_memory_bytes
+
+
+def log_mel_buffer_bytes(window_seconds: int) -> int:
+    """Bytes of the buffers whisper.log_mel_spectrogram allocates for a window, measured on real tensors"""
+    pcm = torch.zeros(window_seconds * SAMPLE_RATE, dtype=torch.int16)
+    audio = pcm.float() / 32768.0
+    padded = torch.nn.functional.pad(audio, (0, N_SAMPLES))
+    stft = torch.stft(padded, N_FFT, HOP_LENGTH, window=torch.hann_window(N_FFT), return_complex=True)
+    magnitudes = stft[..., :-1].abs()
+    squared = magnitudes ** 2
+    mel_spec = mel_filters(audio.device, 80) @ squared
+    log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+    buffers = (pcm, audio, padded, stft, magnitudes, squared, mel_spec, log_spec)
+    return sum(buffer.element_size() * buffer.nelement() for buffer in buffers)
+
+
+@pytest.mark.parametrize("budget_mb", [64, 128, 256, 512])
+def test_planned_window_fits_budget(budget_mb, monkeypatch):
+    # Lift the WINDOW_SECONDS cap so the budget alone sizes the window
+    monkeypatch.setattr(AppConfig, "WINDOW_SECONDS", 10 ** 6)
+    window_seconds = plan_window_seconds(budget_mb, overlap_seconds=5)
+    budget = budget_mb * 1024 * 1024
+
+    assert window_memory_bytes(window_seconds) <= budget
+    assert window_memory_bytes(window_seconds + 1) > budget
+    assert log_mel_buffer_bytes(window_seconds) <= budget
+
+
+def test_budget_too_small_is_rejected():
+    with pytest.raises(MemoryError):
+        plan_window_seconds(8, overlap_seconds=5)